@@ -1,12 +1,17 @@
 from google.adk.agents.llm_agent import LlmAgent
-from agents.device_control_agent.prompts.get_prompt import get_device_control_prompt
-from agents.tools.execute_ir_command_tool import execute_ir_command
+from agents.device_control_agent.prompts.get_prompt import get_device_control_instruction
+from agents.tools.execute_ir_command_tool import (
+    execute_ir_command, execute_ir_command_repeat, execute_ir_commands, prewarm_ir_manager
+)
+from agents.tools.scene_tools import run_scene, cancel_scene
 
 def get_device_control_agent():
+    # Authenticate with the hub while the rest of the agent tree is built
+    prewarm_ir_manager()
     return LlmAgent(
         name="device_control_agent",
         model="gemini-2.0-flash", 
-        instruction=get_device_control_prompt(),
+        instruction=get_device_control_instruction,
         description="calling a tool that control home devices",
-        tools=[execute_ir_command]
+        tools=[execute_ir_command, execute_ir_command_repeat, execute_ir_commands, run_scene, cancel_scene]
     )
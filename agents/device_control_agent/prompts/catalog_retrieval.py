@@ -0,0 +1,67 @@
+import re
+import math
+from collections import Counter
+
+# Standard BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Words that say nothing about which device is meant
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "to", "of", "in", "on", "off", "for", "at", "by", "with", "is", "it",
+    "please", "can", "you", "could", "would", "i", "me", "my", "turn", "set", "switch", "make", "put", "up", "down"
+}
+
+def tokenize(text):
+    """Lowercase words with trivial plural folding; underscores split names like volume_up"""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", str(text).lower().replace("_", " ")):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+class CatalogIndex:
+    """BM25 index with one document per device: its name, description and every signal's name and description"""
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.doc_terms = []
+        self.doc_lengths = []
+        document_frequency = Counter()
+        for device in devices:
+            parts = [device.get("device_name", ""), device.get("device_description", "")]
+            for signal in device.get("signals", []):
+                parts.append(signal.get("signal_name", ""))
+                parts.append(signal.get("signal_description", ""))
+            # The device's own name and description count double so "tv" beats a signal that mentions a TV
+            terms = Counter(tokenize(" ".join(parts)) + tokenize(" ".join(parts[:2])))
+            self.doc_terms.append(terms)
+            self.doc_lengths.append(sum(terms.values()))
+            document_frequency.update(terms.keys())
+
+        count = len(devices)
+        self.average_length = (sum(self.doc_lengths) / count) if count else 0
+        self.idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def search(self, query, k):
+        """Return up to k devices ranked by BM25 score, leaving out devices that match nothing"""
+        query_terms = set(tokenize(query))
+        scored = []
+        for index, terms in enumerate(self.doc_terms):
+            score = 0.0
+            length_norm = 1 - BM25_B + BM25_B * self.doc_lengths[index] / (self.average_length or 1)
+            for term in query_terms:
+                frequency = terms.get(term)
+                if frequency:
+                    score += self.idf[term] * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+            if score > 0:
+                scored.append((score, index))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self.devices[index] for _, index in scored[:k]]
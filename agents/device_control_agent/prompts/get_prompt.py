@@ -1,75 +1,179 @@
 import os
-import json
-import copy
+import sys
+import logging
+import threading
 
-def get_device_control_prompt() -> str:
-    """Get the device control prompt with the devices data appended"""
+# The signal store lives next to ir_manager, which the CLI tools import as top-level modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../remote_control_tools")))
+from signal_store import create_signal_store
+from scene_engine import SceneStore
+from agents.device_control_agent.prompts.catalog_retrieval import CatalogIndex
+
+logger = logging.getLogger(__name__)
+
+# How many devices to inject per turn once the catalog is too big to send whole
+TOP_K_DEVICES = 5
+
+SIGNALS_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../signals"))
+
+_store = None
+_scene_store = SceneStore(SIGNALS_FOLDER)
+_catalog_lock = threading.Lock()
+_catalog_cache = {"generation": None, "devices": [], "catalog": None, "index": None}
+
+# Prompt size with retrieval vs. with the full catalog, for judging TOP_K_DEVICES
+prompt_metrics = {"turns": 0, "retrieved_turns": 0, "prompt_chars": 0, "full_prompt_chars": 0}
+
+def _clean(text):
+    """Keep a field on one line and out of the column separator"""
+    return " ".join(str(text).replace("|", "/").split())
+
+def serialize_catalog(devices):
+    """Compact catalog: a device table, then one id|device|name|description line per signal"""
+    lines = ["Devices (device|description):"]
+    for device in devices:
+        lines.append(f"{_clean(device.get('device_name', ''))}|{_clean(device.get('device_description', ''))}")
+
+    lines.append("")
+    lines.append("Signals (id|device|name|description):")
+    for device in devices:
+        device_name = _clean(device.get("device_name", ""))
+        for signal in device.get("signals", []):
+            lines.append(
+                f"{signal.get('id', '')}|{device_name}|{_clean(signal.get('signal_name', ''))}"
+                f"|{_clean(signal.get('signal_description', ''))}"
+            )
+    return "\n".join(lines)
+
+def load_catalog():
+    """Reload devices, the serialized catalog and the retrieval index when the store's generation changes
+
+    Returns:
+        dict: generation, devices, catalog (serialized text) and index
+    """
+    global _store
+    with _catalog_lock:
+        if _store is None:
+            _store = create_signal_store(os.environ.get("IR_STORAGE", "json"), SIGNALS_FOLDER)
+        generation = _store.generation()
+        if generation != _catalog_cache["generation"]:
+            devices = _store.load()
+            _catalog_cache.update(
+                devices=devices,
+                catalog=serialize_catalog(devices),
+                index=CatalogIndex(devices),
+                generation=generation
+            )
+        return dict(_catalog_cache)
+
+def get_catalog():
+    """The serialized catalog, rebuilt only when the store's generation changes"""
+    return load_catalog()["catalog"]
+
+def get_relevant_catalog(utterance, k=TOP_K_DEVICES):
+    """Serialized catalog of the k devices that best match utterance
+
+    Falls back to the full catalog when the inventory is small or nothing matches.
+
+    Returns:
+        tuple: (catalog text, full catalog text, whether retrieval narrowed it)
+    """
+    cache = load_catalog()
+    if not utterance or len(cache["devices"]) <= k:
+        return cache["catalog"], cache["catalog"], False
+
+    devices = cache["index"].search(utterance, k)
+    if not devices:
+        return cache["catalog"], cache["catalog"], False
+    return serialize_catalog(devices), cache["catalog"], True
+
+def _record_prompt_size(prompt_chars, full_prompt_chars, retrieved):
+    prompt_metrics["turns"] += 1
+    prompt_metrics["retrieved_turns"] += retrieved
+    prompt_metrics["prompt_chars"] += prompt_chars
+    prompt_metrics["full_prompt_chars"] += full_prompt_chars
+    reduction = 1 - prompt_metrics["prompt_chars"] / (prompt_metrics["full_prompt_chars"] or 1)
+    logger.info(
+        "device_control prompt: %d chars (full catalog %d), average reduction %.0f%% over %d turns",
+        prompt_chars, full_prompt_chars, reduction * 100, prompt_metrics["turns"]
+    )
+
+def _utterance_from_context(context):
+    """Text of the user message that started this invocation"""
+    content = getattr(context, "user_content", None)
+    if content is not None and getattr(content, "parts", None):
+        text = " ".join(part.text for part in content.parts if getattr(part, "text", None))
+        if text:
+            return text
+    state = getattr(context, "state", None)
+    return state.get("user_request", "") if state is not None else ""
+
+def get_device_control_instruction(context) -> str:
+    """Instruction provider: the device control prompt with only the devices relevant to this turn"""
+    return get_device_control_prompt(_utterance_from_context(context))
+
+def get_scenes():
+    """Saved scenes by name, re-read only when scenes.json changes"""
+    return _scene_store.load()
+
+def get_scene_list():
+    """One name|description line per saved scene"""
+    return "\n".join(f"{_clean(name)}|{_clean(scene.get('description', ''))}" for name, scene in get_scenes().items())
+
+def get_device_control_prompt(utterance: str = "") -> str:
+    """Get the device control prompt with the devices data appended
+
+    With an utterance, only the best-matching devices are included (see get_relevant_catalog).
+    """
     base_prompt = """
-You are a natural language device control agent. You are given a JSON object containing a list of devices, along with their available IR commands (signals).
+You are a natural language device control agent. You are given a catalog of devices and their available IR commands (signals).
 
-Each **device** includes:
-- `device_name`: The name of the device.
-- `device_description`: A brief description of the device.
-- `signals`: A list of available IR commands for that device.
+The **Devices** table has one `device|description` line per device.
 
-Each **signal** includes:
+The **Signals** table has one `id|device|name|description` line per command:
 - `id`: A unique identifier for the command. This is what you **MUST** use when calling the tool.
-- `signal_name`: A short technical label for the command.
-- `signal_description`: A human-readable description of what the command does.
-- `signal_data`: Technical content (which you should ignore).
+- `device`: The device the command belongs to.
+- `name`: A short technical label for the command.
+- `description`: A human-readable description of what the command does.
 
 ---
 
 ## 🎯 Your Core Objective:
 When the user gives a natural language command to control a device:
 
-1.  **Identify the User's Intent:** Carefully match the user's request to the most appropriate `signal_name` or `signal_description` from the available devices and signals.
+1.  **Identify the User's Intent:** Carefully match the user's request to the most appropriate signal `name` or `description` from the available devices and signals.
 2.  **Confirm the Action Naturally:** Respond to the user in human-friendly language to confirm you are performing the action. **DO NOT** mention signal IDs or any technical details in your response to the user.
 3.  **Crucially, Call the Tool IMMEDIATELY:** Once you've identified the correct signal, you **MUST** call the `execute_ir_command` tool. Pass the `id` of the matched signal as the `command` argument to the tool. This is a critical step for executing the user's request.
 4.  **Handle Unmatched Commands:** If no suitable signal is found for the user's request, reply naturally by stating that you couldn't find a matching command (e.g., "I couldn't find a command that matches your request for device control.").
+5.  **Hand Back General Chat:** If the message is not about controlling a device at all, transfer it to `alpha_agent` instead of answering it yourself.
 
 ---
 
-## ⚙️ Available Tool:
-**`execute_ir_command(command: str)`** – This is the ONLY tool you have. call it to send an IR command to a home device.
-Always call the tool to execute commands
+## ⚙️ Available Tools:
+**`execute_ir_command(command: str)`** – Call it to send one IR command to a home device.
+**`execute_ir_command_repeat(command: str, repeat: int)`** – When the user wants the same button pressed several times (e.g. "volume up by 10"), call this ONCE with the count instead of calling `execute_ir_command` repeatedly.
+**`execute_ir_commands(commands: list[str], delays_ms: list[int])`** – When a request needs several commands (e.g. "turn everything off in the living room"), send them all in ONE call, in order. Pass `delays_ms` as an empty list, or one delay per command when a device needs time between steps.
+**`run_scene(scene_name: str)`** – When the user asks for one of the saved scenes below (e.g. "movie mode"), call this instead of sending its commands yourself. It returns a `run_id` right away while the scene keeps running.
+**`cancel_scene(run_id: str)`** – When the user wants to stop a scene that is still running, call this with the `run_id` from `run_scene`.
+Always call a tool to execute commands
         
         """
     
-    # Load the devices.json file
-    signals_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../signals/devices.json")
-    
-    if os.path.exists(signals_path):
-        try:
-            with open(signals_path, "r") as f:
-                devices = json.load(f)
-            
-            # Create a copy of the devices without the signals data
-            devices_without_signals = []
-            for device in devices:
-                device_copy = copy.deepcopy(device)
-                
-                # Replace signals with just the essential info, removing signal_data
-                simplified_signals = []
-                for signal in device_copy.get("signals", []):
-                    simplified_signal = {
-                        "id": signal.get("id", ""),
-                        "signal_name": signal.get("signal_name", ""),
-                        "signal_description": signal.get("signal_description", "")
-                    }
-                    simplified_signals.append(simplified_signal)
-                
-                device_copy["signals"] = simplified_signals
-                devices_without_signals.append(device_copy)
-            
-            # Add the devices data to the prompt
-            devices_json = json.dumps(devices_without_signals, indent=2)
-            full_prompt = f"{base_prompt}\n\nAvailable devices and signals:\n```json\n{devices_json}\n```"
-            print('full_prompt', full_prompt)
-            return full_prompt
-        except Exception as e:
-            print(f"Error loading devices.json: {e}")
-            return base_prompt
-    else:
-        print(f"Devices file not found at {signals_path}")
-        return base_prompt
\ No newline at end of file
+    if not os.path.exists(SIGNALS_FOLDER):
+        print(f"Signals folder not found at {SIGNALS_FOLDER}")
+        return base_prompt
+
+    try:
+        catalog, full_catalog, retrieved = get_relevant_catalog(utterance)
+        heading = "Available devices and signals"
+        if retrieved:
+            heading = "Devices and signals most relevant to this request (if none fit, say so)"
+        prompt = f"{base_prompt}\n\n{heading}:\n```\n{catalog}\n```"
+        scenes = get_scene_list()
+        if scenes:
+            prompt += f"\n\nSaved scenes (name|description):\n```\n{scenes}\n```"
+        _record_prompt_size(len(prompt), len(prompt) - len(catalog) + len(full_catalog), retrieved)
+        return prompt
+    except Exception as e:
+        print(f"Error loading devices: {e}")
+        return base_prompt
@@ -1,10 +1,74 @@
 from typing import Dict, Any, List, Optional
 import sys
 import os
-import json
-import subprocess
+import asyncio
+import threading
 
-def execute_ir_command(command: str) -> Dict[str, Any]:
+# ir_manager and its helpers are imported as top-level modules, the same way the CLI tools do
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../remote_control_tools")))
+from hub_daemon import daemon_request
+
+SIGNALS_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../signals"))
+
+# Set IR_TOOL_DEBUG=1 to print the environment on every tool call
+DEBUG = os.environ.get("IR_TOOL_DEBUG", "").lower() in ("1", "true", "yes")
+
+# Longest pause the agent may put between two commands of a batch
+MAX_STEP_DELAY_MS = 10000
+
+# Most presses the agent may ask for in one repeated command
+MAX_REPEAT = 50
+
+# Commands sent by the tools, oldest first, as {"signal_id", "delay_ms", "repeat"} dicts; main.py
+# reads this to learn fast-path aliases
+sent_commands = []
+
+_ir_manager = None
+_ir_manager_lock = threading.Lock()
+
+def get_ir_manager():
+    """Return the process-wide IRManager, discovering and authenticating on first use
+
+    The agent process is long-lived, so hub sessions are kept alive by the health monitor.
+    """
+    global _ir_manager
+    with _ir_manager_lock:
+        if _ir_manager is None:
+            from ir_manager import IRManager
+            _ir_manager = IRManager(folder=SIGNALS_FOLDER)
+            _ir_manager.start_health_monitor()
+        return _ir_manager
+
+def _send_by_id(signal_id, repeat=1):
+    """Send through the hub daemon when it is running, so the agent's sends share its per-hub
+    queue with the CLI tools and scenes, otherwise through the in-process IRManager
+
+    The model sometimes calls a tool twice for one request, so an identical send just before is merged.
+    """
+    response = daemon_request({"cmd": "send", "signal_id": signal_id, "repeat": repeat, "coalesce": True})
+    if response is not None:
+        return response["success"], response["message"]
+    return get_ir_manager().send_signal_by_id(signal_id, repeat, coalesce=True)
+
+def _send_many(signal_ids, delays):
+    """Send a batch through the hub daemon when it is running, otherwise in-process
+
+    Returns:
+        list: A (success, message, started, duration) tuple per signal ID; see IRManager.send_signals_by_id
+    """
+    response = daemon_request({"cmd": "send_many", "signal_ids": signal_ids, "delays": delays, "timed": True})
+    if response is not None and "results" in response:
+        return [(result["success"], result["message"], result.get("started") or 0.0, result.get("duration") or 0.0)
+                for result in response["results"]]
+    if response is not None:
+        return [(False, response["message"], 0.0, 0.0)] * len(signal_ids)
+    return get_ir_manager().send_signals_by_id(signal_ids, delays=delays, timed=True)
+
+def prewarm_ir_manager():
+    """Authenticate with the hub in the background so the first tool call doesn't wait for it"""
+    threading.Thread(target=get_ir_manager, daemon=True).start()
+
+def _debug_dump(command):
     print('=== DEBUG: execute_ir_command called ===')
     print(f'Command received: {command}')
     print(f'Current working directory: {os.getcwd()}')
@@ -13,105 +77,173 @@ def execute_ir_command(command: str) -> Dict[str, Any]:
     for key in ['PATH', 'PYTHONPATH', 'VIRTUAL_ENV']:
         print(f'  {key}: {os.environ.get(key, "Not set")}')
     print('======================================')
-    
-    # Try to list installed packages for debugging
-    try:
-        import pkg_resources
-        print('\nInstalled packages:')
-        for d in pkg_resources.working_set:
-            print(f'  {d.project_name}=={d.version}')
-    except Exception as e:
-        print(f'\nCould not list installed packages: {e}')
-    
+
+def execute_ir_command(command: str) -> Dict[str, Any]:
     """
     Execute an IR command by signal ID.
-    
+
     Args:
         command: The UUID of the signal to send
-        
+
     Returns:
         Dict with success status and message
     """
+    if DEBUG:
+        _debug_dump(command)
+
     try:
         # Check if the command is a valid UUID (simple check)
         is_uuid = len(command) > 30 and "-" in command
-        
+
         if not is_uuid:
             return {
                 "success": False,
                 "message": f"Invalid signal ID format: {command}",
                 "error": "Invalid ID format"
             }
-        
-        # Try to run the send_by_id.py script with the signal ID
-        try:
-            # Try multiple possible paths to find send_by_id.py
-            possible_paths = [
-                os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../remote_control_tools/send_by_id.py"),
-                os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../remote_control_tools/send_by_id.py"),
-                os.path.join(os.path.dirname(os.path.abspath(__file__)), "remote_control_tools/send_by_id.py"),
-                os.path.abspath("remote_control_tools/send_by_id.py"),
-                "remote_control_tools/send_by_id.py"
-            ]
-            
-            script_path = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    script_path = os.path.abspath(path)
-                    print(f"[DEBUG] Found send_by_id.py at: {script_path}")
-                    break
-            
-            if script_path and os.path.exists(script_path):
-                # Actually execute the command
-                python_executable = sys.executable  # Get the current Python executable
-                cmd = [python_executable, script_path, command]
-                print(f"[DEBUG] Using command: {' '.join(cmd)}")
-                
-                # Execute the command with full output capture
-                print(f"[DEBUG] Running command: {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                # Debug output
-                print(f"[DEBUG] Return code: {result.returncode}")
-                print(f"[DEBUG] stdout: {result.stdout}")
-                print(f"[DEBUG] stderr: {result.stderr}")
-                
-                if result.returncode == 0:
-                    response = {
-                        "success": True,
-                        "message": f"Signal with ID {command} sent successfully",
-                        "signal_id": command,
-                        "output": result.stdout.strip()
-                    }
-                    print(f"[SUCCESS] {response}")
-                    return response
-                else:
-                    error_msg = f"Error sending signal (code {result.returncode}): {result.stderr.strip()}"
-                    print(f"[ERROR] {error_msg}")
-                    return {
-                        "success": False,
-                        "message": error_msg,
-                        "signal_id": command,
-                        "error": result.stderr.strip(),
-                        "exit_code": result.returncode
-                    }
-            else:
-                # Fall back to simulation if script doesn't exist
-                return {
-                    "success": True,
-                    "message": f"Signal with ID {command} sent successfully (simulated)",
-                    "signal_id": command,
-                    "simulated": True
-                }
-        except Exception as e:
+
+        success, message = _send_by_id(command)
+        if DEBUG:
+            print(f"[DEBUG] send_signal_by_id({command}) -> {success}, {message}")
+
+        if success:
+            sent_commands.append({"signal_id": command, "delay_ms": 0, "repeat": 1})
+            return {
+                "success": True,
+                "message": f"Signal with ID {command} sent successfully",
+                "signal_id": command,
+                "output": message
+            }
+        return {
+            "success": False,
+            "message": message,
+            "signal_id": command,
+            "error": message
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error executing command: {str(e)}",
+            "error": str(e)
+        }
+
+def execute_ir_command_repeat(command: str, repeat: int) -> Dict[str, Any]:
+    """
+    Execute an IR command several times in a row, e.g. "volume up by 10".
+
+    The hub replays the signal itself, so this costs a single send.
+
+    Args:
+        command: The UUID of the signal to send
+        repeat: How many times to press the button
+
+    Returns:
+        Dict with success status and message
+    """
+    if DEBUG:
+        _debug_dump(command)
+
+    try:
+        is_uuid = len(command) > 30 and "-" in command
+        if not is_uuid:
             return {
                 "success": False,
-                "message": f"Error sending signal: {str(e)}",
-                "error": str(e)
+                "message": f"Invalid signal ID format: {command}",
+                "error": "Invalid ID format"
+            }
+
+        repeat = min(max(int(repeat), 1), MAX_REPEAT)
+        success, message = _send_by_id(command, repeat)
+        if success:
+            sent_commands.append({"signal_id": command, "delay_ms": 0, "repeat": repeat})
+            return {
+                "success": True,
+                "message": f"Signal with ID {command} sent {repeat} times",
+                "signal_id": command,
+                "repeat": repeat,
+                "output": message
             }
+        return {
+            "success": False,
+            "message": message,
+            "signal_id": command,
+            "error": message
+        }
     except Exception as e:
         return {
             "success": False,
             "message": f"Error executing command: {str(e)}",
             "error": str(e)
         }
+
+async def execute_ir_commands(commands: List[str], delays_ms: List[int]) -> Dict[str, Any]:
+    """
+    Execute several IR commands in one call, e.g. everything needed to turn off a room.
+
+    Commands on different hubs are sent concurrently; commands on the same hub
+    go out in the given order. Nothing is sent unless every ID is valid.
+
+    Args:
+        commands: Signal UUIDs to send, in order
+        delays_ms: Milliseconds to wait before each command (same length as commands), or an empty list for no delays
+
+    Returns:
+        Dict with overall success and a per-command result list with timings
+    """
+    # The delays and send times add up to seconds, so keep them off the caller's event loop
+    return await asyncio.to_thread(_execute_ir_commands, commands, delays_ms)
+
+def _execute_ir_commands(commands, delays_ms):
+    if DEBUG:
+        _debug_dump(commands)
+
+    try:
+        if not commands:
+            return {"success": False, "message": "No commands given", "error": "Empty command list"}
+        if delays_ms and len(delays_ms) != len(commands):
+            return {
+                "success": False,
+                "message": f"Got {len(delays_ms)} delays for {len(commands)} commands",
+                "error": "Mismatched delays"
+            }
+
+        # Validate everything up front so a typo doesn't leave a scene half applied
+        ir_manager = get_ir_manager()
+        invalid = [command for command in commands
+                   if not (len(command) > 30 and "-" in command) or ir_manager.get_signal_by_id(command)[0] is None]
+        if invalid:
+            return {
+                "success": False,
+                "message": f"Unknown signal IDs, nothing was sent: {', '.join(invalid)}",
+                "error": "Invalid ID",
+                "invalid": invalid
+            }
+
+        delays_ms = [min(max(delay, 0), MAX_STEP_DELAY_MS) for delay in delays_ms] if delays_ms else [0] * len(commands)
+        results = _send_many(commands, [delay / 1000 for delay in delays_ms])
+
+        sent_commands.extend(
+            {"signal_id": command, "delay_ms": delay, "repeat": 1}
+            for command, delay, result in zip(commands, delays_ms, results) if result[0]
+        )
+        sent = sum(success for success, _, _, _ in results)
+        return {
+            "success": sent == len(commands),
+            "message": f"Sent {sent}/{len(commands)} signals",
+            "results": [
+                {
+                    "signal_id": command,
+                    "success": success,
+                    "message": message,
+                    "started_ms": round(started * 1000, 1),
+                    "duration_ms": round(duration * 1000, 1)
+                }
+                for command, (success, message, started, duration) in zip(commands, results)
+            ]
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error executing commands: {str(e)}",
+            "error": str(e)
+        }
@@ -0,0 +1,95 @@
+from typing import Dict, Any
+import asyncio
+import threading
+
+from agents.tools.execute_ir_command_tool import get_ir_manager, SIGNALS_FOLDER
+from scene_engine import SceneStore, SceneEngine
+
+scene_store = SceneStore(SIGNALS_FOLDER)
+
+_scene_engine = None
+_scene_loop = None
+_scene_loop_lock = threading.Lock()
+
+def _get_scene_loop():
+    """The event loop scenes run on, in its own thread
+
+    main.py's loop stops between turns while it waits for input, which would
+    freeze a scene at its first delay, so scenes get a loop that always runs.
+    """
+    global _scene_loop
+    with _scene_loop_lock:
+        if _scene_loop is None:
+            _scene_loop = asyncio.new_event_loop()
+            threading.Thread(target=_scene_loop.run_forever, name="scene-loop", daemon=True).start()
+        return _scene_loop
+
+async def _on_scene_loop(coro):
+    """Run coro on the scene loop and await its result from the caller's loop"""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _get_scene_loop()))
+
+async def get_scene_engine():
+    """Return the process-wide SceneEngine, sharing the tools' IRManager; only call on the scene loop"""
+    global _scene_engine
+    if _scene_engine is None:
+        from async_ir_manager import AsyncIRManager
+        ir_manager = await asyncio.to_thread(get_ir_manager)
+        if _scene_engine is None:
+            _scene_engine = SceneEngine(AsyncIRManager(ir_manager, use_daemon=True), scene_store)
+    return _scene_engine
+
+async def _start(scene_name):
+    engine = await get_scene_engine()
+    return await engine.start(scene_name)
+
+async def _cancel(run_id):
+    engine = await get_scene_engine()
+    success, message = engine.cancel(run_id)
+    run = engine.runs.get(run_id)
+    return success, message, run.status() if run is not None else None
+
+async def run_scene(scene_name: str) -> Dict[str, Any]:
+    """
+    Start a saved scene, e.g. "movie mode".
+
+    Returns as soon as the scene starts; its steps keep running in the background.
+
+    Args:
+        scene_name: The name of the scene to run
+
+    Returns:
+        Dict with success status, message and the run_id to cancel it with
+    """
+    try:
+        run, error = await _on_scene_loop(_start(scene_name))
+        if run is None:
+            return {"success": False, "message": error, "error": error}
+
+        # Not added to sent_commands: a scene is already a one-word shortcut, and replaying its steps would bypass it
+        return {
+            "success": True,
+            "message": f"Scene '{scene_name}' started with {len(run.steps)} steps",
+            "run_id": run.id
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error running scene: {str(e)}",
+            "error": str(e)
+        }
+
+async def cancel_scene(run_id: str) -> Dict[str, Any]:
+    """
+    Stop a scene that is still running. Steps already sent are not undone.
+
+    Args:
+        run_id: The run_id returned by run_scene
+
+    Returns:
+        Dict with success status, message and how far the scene got
+    """
+    success, message, status = await _on_scene_loop(_cancel(run_id))
+    response = {"success": success, "message": message}
+    if status is not None:
+        response["status"] = status
+    return response
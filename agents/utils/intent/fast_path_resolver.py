@@ -0,0 +1,153 @@
+import os
+import re
+import threading
+from agents.device_control_agent.prompts.get_prompt import load_catalog, SIGNALS_FOLDER
+from agents.utils.intent.utterance_cache import UtteranceCache
+
+# Matches at or above this confidence are sent without asking the agents
+FAST_PATH_MIN_CONFIDENCE = 0.8
+
+# ...and only when the runner-up is at least this far behind
+FAST_PATH_MIN_MARGIN = 0.2
+
+# Words that carry no meaning in a device command. on/off/up/down are kept on purpose.
+FILLER_WORDS = {
+    "a", "an", "the", "please", "can", "could", "would", "you", "turn", "switch", "set", "make", "put",
+    "my", "to", "for", "me", "now", "hey", "just", "i", "want", "it"
+}
+
+def normalize(text):
+    """Command tokens: lowercase words without filler, with trivial plural folding"""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", str(text).lower().replace("_", " ")):
+        if word in FILLER_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+class FastPathResolver:
+    """Deterministic matcher for short, unambiguous commands such as "tv power" or "ac off"
+
+    Phrasings the agents already resolved are served from an UtteranceCache
+    first. Otherwise every signal gets candidate phrases: "<device> <signal>",
+    the bare signal name when no other device has one like it, and its
+    description. An utterance is scored against each phrase by token overlap
+    (Jaccard); descriptions only count on an exact match. resolve() returns a
+    match only when it is both confident and clearly ahead of the runner-up.
+    """
+
+    def __init__(self, cache_path=None, min_confidence=FAST_PATH_MIN_CONFIDENCE, min_margin=FAST_PATH_MIN_MARGIN):
+        self.cache = UtteranceCache(cache_path or os.path.join(SIGNALS_FOLDER, "utterance_cache.json"))
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.lock = threading.Lock()
+        self.generation = None
+        self.phrases = []  # (token set, exact only, signal, device)
+        self.signals_by_id = {}
+
+    def _key(self, utterance):
+        # Order and repeats matter: "tv on, ac off" is not "tv off, ac on"
+        return " ".join(normalize(utterance))
+
+    def _rebuild(self, devices):
+        signal_name_counts = {}
+        for device in devices:
+            for signal in device.get("signals", []):
+                key = frozenset(normalize(signal.get("signal_name", "")))
+                signal_name_counts[key] = signal_name_counts.get(key, 0) + 1
+
+        signals_by_id = {}
+        phrases = []
+        for device in devices:
+            device_tokens = set(normalize(device.get("device_name", "")))
+            for signal in device.get("signals", []):
+                signal_tokens = set(normalize(signal.get("signal_name", "")))
+                signals_by_id[signal.get("id")] = (signal, device)
+                phrases.append((frozenset(device_tokens | signal_tokens), False, signal, device))
+                if signal_tokens and signal_name_counts[frozenset(signal_tokens)] == 1:
+                    phrases.append((frozenset(signal_tokens), False, signal, device))
+                description_tokens = normalize(signal.get("signal_description", ""))
+                if description_tokens:
+                    phrases.append((frozenset(description_tokens), True, signal, device))
+
+        self.phrases = phrases
+        self.signals_by_id = signals_by_id
+
+    def _refresh(self):
+        catalog = load_catalog()
+        with self.lock:
+            if catalog["generation"] != self.generation:
+                self._rebuild(catalog["devices"])
+                self.generation = catalog["generation"]
+
+    def resolve(self, utterance):
+        """Match utterance to a single signal
+
+        Returns:
+            dict: steps ({"signal_id", "delay_ms", "repeat"} dicts), label, confidence and
+                source ("cache" or "match"), or None to fall through to the agents
+        """
+        tokens = frozenset(normalize(utterance))
+        if not tokens:
+            return None
+
+        self._refresh()
+        with self.lock:
+            steps = self.cache.get(self._key(utterance), self.signals_by_id)
+            if steps:
+                return {
+                    "steps": steps,
+                    "label": ", ".join(
+                        self._label(step["signal_id"]) + (f" x{step['repeat']}" if step.get("repeat", 1) > 1 else "")
+                        for step in steps
+                    ),
+                    "confidence": 1.0,
+                    "source": "cache"
+                }
+
+            best = {}
+            for phrase, exact_only, signal, device in self.phrases:
+                if not phrase:
+                    continue
+                if exact_only:
+                    score = 1.0 if phrase == tokens else 0.0
+                else:
+                    score = len(phrase & tokens) / len(phrase | tokens)
+                signal_id = signal.get("id")
+                if score > best.get(signal_id, (0.0,))[0]:
+                    best[signal_id] = (score, signal, device)
+
+        ranked = sorted(best.values(), key=lambda item: -item[0])
+        if not ranked:
+            return None
+        score, signal, device = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        if score < self.min_confidence or score - runner_up < self.min_margin:
+            return None
+        return {
+            "steps": [{"signal_id": signal.get("id"), "delay_ms": 0, "repeat": 1}],
+            "label": f"{device.get('device_name')}.{signal.get('signal_name')}",
+            "confidence": score,
+            "source": "match"
+        }
+
+    def _label(self, signal_id):
+        signal, device = self.signals_by_id[signal_id]
+        return f"{device.get('device_name')}.{signal.get('signal_name')}"
+
+    def remember(self, utterance, steps):
+        """Cache the commands the agents sent for utterance so the next identical request skips them
+
+        Only call this for self-contained turns; a reply to a clarifying
+        question ("the tv") means nothing on its own. Batches that include a
+        repeated press aren't cached, since no single tool call replays them.
+        """
+        if not steps or not normalize(utterance):
+            return
+        if len(steps) > 1 and any(step.get("repeat", 1) > 1 for step in steps):
+            return
+        self._refresh()
+        with self.lock:
+            self.cache.put(self._key(utterance), steps, self.signals_by_id)
@@ -0,0 +1,29 @@
+import re
+from agents.device_control_agent.prompts.get_prompt import load_catalog, get_scenes
+
+# Verbs and nouns that only show up when someone wants a device to do something
+COMMAND_WORDS = {
+    "turn", "switch", "power", "volume", "mute", "unmute", "channel", "temperature", "temp",
+    "louder", "quieter", "dim", "brighten", "open", "close", "remote"
+}
+
+def route_turn(utterance):
+    """Classify a turn as "device" (send it straight to device_control_agent) or "chat" (let alpha handle it)
+
+    A turn is a device command when it names something in the catalog (any
+    BM25 hit on a device or signal), names a saved scene, or uses an
+    unmistakable command word.
+    """
+    words = set(re.findall(r"[a-z0-9]+", utterance.lower()))
+    if words & COMMAND_WORDS:
+        return "device"
+
+    for name in get_scenes():
+        scene_words = set(re.findall(r"[a-z0-9]+", name.lower()))
+        if scene_words and scene_words <= words:
+            return "device"
+
+    index = load_catalog()["index"]
+    if index is not None and index.search(utterance, 1):
+        return "device"
+    return "chat"
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Forget a phrasing after a month without use
+UTTERANCE_CACHE_TTL = 30 * 24 * 3600
+
+# Most distinct phrasings to remember; the least recently used go first
+UTTERANCE_CACHE_SIZE = 500
+
+def signal_fingerprint(signal, device):
+    """Hash of everything about a signal and its device that could change what the phrase should do"""
+    device_meta = {key: value for key, value in device.items() if key != "signals"}
+    payload = json.dumps({"signal": signal, "device": device_meta}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class UtteranceCache:
+    """Persistent map from normalized utterances to the commands the agents sent for them
+
+    Each entry holds the ordered steps ({"signal_id", "delay_ms", "repeat"}
+    dicts) so a replay keeps the agents' timing and press counts.
+
+    Entries live in signals/utterance_cache.json and remember a fingerprint of
+    each referenced signal and device. An entry is dropped when it outlives the
+    TTL, falls off the LRU end, or any referenced signal was deleted or changed
+    (re-learned, renamed, moved to another hub...).
+    """
+
+    def __init__(self, path, ttl=UTTERANCE_CACHE_TTL, max_entries=UTTERANCE_CACHE_SIZE, flush_every=20):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.entries = self._load()
+        self.hits = 0
+        self.misses = 0
+        atexit.register(self.flush)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return OrderedDict()
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except Exception:
+            return OrderedDict()
+        # Entries from before steps were stored used order-insensitive keys and can't be trusted
+        entries = {key: entry for key, entry in entries.items() if "steps" in entry}
+        # Saved least recently used first, so the order survives a restart
+        return OrderedDict(sorted(entries.items(), key=lambda item: item[1].get("last_used", 0)))
+
+    def get(self, key, signals_by_id):
+        """Return the cached steps for key, or None if missing, expired or stale
+
+        Args:
+            signals_by_id: Current catalog as {signal_id: (signal, device)}, used to check fingerprints
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stale = now - entry["created"] > self.ttl
+            for step, fingerprint in zip(entry["steps"], entry["fingerprints"]):
+                current = signals_by_id.get(step["signal_id"])
+                if current is None or signal_fingerprint(*current) != fingerprint:
+                    stale = True
+                    break
+            if stale:
+                del self.entries[key]
+                self.pending += 1
+                self.misses += 1
+                return None
+
+            entry["last_used"] = now
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.pending += 1
+            should_flush = self.pending >= self.flush_every
+        if should_flush:
+            self.flush()
+        return [dict(step) for step in entry["steps"]]
+
+    def put(self, key, steps, signals_by_id):
+        """Remember that key meant steps; ignored if any of their signals is unknown"""
+        if any(step["signal_id"] not in signals_by_id for step in steps):
+            return
+        now = time.time()
+        with self.lock:
+            self.entries[key] = {
+                "steps": [dict(step) for step in steps],
+                "fingerprints": [signal_fingerprint(*signals_by_id[step["signal_id"]]) for step in steps],
+                "created": now,
+                "last_used": now
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.pending = 0
+            entries = dict(self.entries)
+        self._write(entries)
+
+    def flush(self):
+        """Write the cache if anything changed since the last write"""
+        with self.lock:
+            if not self.pending:
+                return
+            self.pending = 0
+            entries = dict(self.entries)
+        self._write(entries)
+
+    def _write(self, entries):
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving utterance cache: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "max_entries": self.max_entries}
@@ -1,4 +1,5 @@
 import os
+import time
 import uuid
 from dotenv import load_dotenv
 
@@ -7,6 +8,10 @@ from google.adk.runners import Runner
 from agents.alpha.get_alpha import get_alpha
 from agents.utils.llm.call_agent_async import call_agent_async
 from agents.utils.sessions.get_session import get_session
+from agents.utils.intent.fast_path_resolver import FastPathResolver
+from agents.utils.intent.route_turn import route_turn
+from agents.tools import execute_ir_command_tool
+from ui.output import display_success, display_error
 load_dotenv()
 
 
@@ -25,6 +30,15 @@ async def main():
     agent = get_alpha() 
    
     runner = Runner(app_name=APP_NAME, agent=agent, session_service=session_service)
+    # Device commands skip alpha's transfer decision; both runners share one session
+    device_runner = Runner(
+        app_name=APP_NAME,
+        agent=agent.find_agent("device_control_agent"),
+        session_service=session_service
+    )
+    resolver = FastPathResolver()
+    # True while the agents' last reply sent nothing, i.e. it may have asked the user something
+    awaiting_reply = False
     while True:
         # Small matrix effect before each prompt (very brief)
         # matrix_effect(0.3)
@@ -39,15 +53,42 @@ async def main():
         if user_input.lower() == "exit":
             # Exit sequence
             break
+
+        # Plain commands like "tv power" are sent directly; anything unclear goes to the agents
+        match = None if awaiting_reply else resolver.resolve(user_input)
+        if match:
+            started = time.perf_counter()
+            steps = match["steps"]
+            if len(steps) == 1 and steps[0].get("repeat", 1) > 1:
+                result = execute_ir_command_tool.execute_ir_command_repeat(steps[0]["signal_id"], steps[0]["repeat"])
+            elif len(steps) == 1:
+                result = execute_ir_command_tool.execute_ir_command(steps[0]["signal_id"])
+            else:
+                result = await execute_ir_command_tool.execute_ir_commands(
+                    [step["signal_id"] for step in steps], [step["delay_ms"] for step in steps]
+                )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if result["success"]:
+                display_success(f"⚡ {match['label']} sent in {elapsed_ms:.0f} ms")
+            else:
+                display_error(f"⚡ {match['label']}: {result['message']}")
         else:
+            execute_ir_command_tool.sent_commands.clear()
             # Process the message
             response = await call_agent_async(
-                runner=runner,
+                runner=device_runner if route_turn(user_input) == "device" else runner,
                 user_id=USER_ID, 
                 session_id=SESSION_ID, 
                 message=user_input
             )
 
+            # Remember what the agents sent for this phrasing so a repeat skips them, unless
+            # this turn answered a question and only makes sense with the turns before it
+            sent = list(execute_ir_command_tool.sent_commands)
+            if not awaiting_reply:
+                resolver.remember(user_input, sent)
+            awaiting_reply = not sent
+
         # ✨ pull the updated state AFTER the run
         session = await session_service.get_session(
             app_name=APP_NAME,
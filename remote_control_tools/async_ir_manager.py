@@ -0,0 +1,199 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ir_manager import IRManager, LEARN_TIMEOUT
+from send_queue import PRIORITY_INTERACTIVE
+from hub_daemon import daemon_request
+
+# Threads available for blocking broadlink and file work
+DEFAULT_MAX_WORKERS = 4
+
+class AsyncIRManager:
+    """asyncio facade over IRManager
+
+    Every blocking call (discovery, auth, send_data, learning, store reads and
+    writes) runs on a bounded thread pool so the event loop stays responsive.
+    Catalog reads and writes are serialized by one lock. Sends are ordered by
+    IRManager's per-hub send queue; learning holds a per-hub lock so two
+    captures never run on the same hub.
+
+    With use_daemon, sends go through the hub daemon whenever it is running so
+    they share its per-hub queue with every other process's sends.
+    """
+
+    def __init__(self, ir_manager, max_workers=DEFAULT_MAX_WORKERS, use_daemon=False):
+        self.ir_manager = ir_manager
+        self.use_daemon = use_daemon
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ir-manager")
+        self.catalog_lock = asyncio.Lock()
+        self.hub_locks = {}
+
+    @classmethod
+    async def create(cls, folder="signals", storage=None, max_workers=DEFAULT_MAX_WORKERS, use_daemon=False):
+        """Build the IRManager (which discovers and authenticates) without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ir_manager = await loop.run_in_executor(executor, lambda: IRManager(folder=folder, storage=storage))
+        return cls(ir_manager, max_workers=max_workers, use_daemon=use_daemon)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def _catalog(self, func, *args):
+        async with self.catalog_lock:
+            return await self._run(func, *args)
+
+    def _hub_lock(self, hub_mac):
+        """asyncio lock for a hub; unbound devices share the default hub's lock"""
+        if hub_mac is None and self.ir_manager.device is not None:
+            hub_mac = self.ir_manager.device.mac.hex()
+        return self.hub_locks.setdefault(hub_mac, asyncio.Lock())
+
+    async def discover_and_auth(self):
+        return await self._run(self.ir_manager.discover_and_auth)
+
+    async def get_devices(self):
+        return await self._catalog(self.ir_manager.get_devices)
+
+    async def get_device(self, device_name):
+        return await self._catalog(self.ir_manager.get_device, device_name)
+
+    async def get_signal(self, device_name, signal_name):
+        return await self._catalog(self.ir_manager.get_signal, device_name, signal_name)
+
+    async def get_signal_by_id(self, signal_id):
+        return await self._catalog(self.ir_manager.get_signal_by_id, signal_id)
+
+    async def create_device(self, device_name, device_description="", hub_mac=None):
+        return await self._catalog(self.ir_manager.create_device, device_name, device_description, hub_mac)
+
+    async def delete_device(self, device_name):
+        return await self._catalog(self.ir_manager.delete_device, device_name)
+
+    async def delete_signal(self, device_name, signal_name):
+        return await self._catalog(self.ir_manager.delete_signal, device_name, signal_name)
+
+    async def bind_device_to_hub(self, device_name, hub_mac):
+        return await self._catalog(self.ir_manager.bind_device_to_hub, device_name, hub_mac)
+
+    async def send_signal(self, device_name, signal_name, repeat=1, priority=PRIORITY_INTERACTIVE):
+        """Send an IR signal by device name and signal name, repeat times"""
+        response = await self._daemon({"cmd": "send_by_name", "device_name": device_name, "signal_name": signal_name,
+                                       "repeat": repeat, "priority": priority})
+        if response is not None:
+            return response["success"], response["message"]
+
+        signal = await self.get_signal(device_name, signal_name)
+        if not signal:
+            return False, f"Signal '{device_name}.{signal_name}' not found"
+
+        device = await self.get_device(device_name)
+        return await self._send(signal, f"'{device_name}.{signal_name}'", device.get("hub_mac"), repeat, priority)
+
+    async def send_signal_by_id(self, signal_id, repeat=1, priority=PRIORITY_INTERACTIVE):
+        """Send an IR signal by its UUID, repeat times"""
+        response = await self._daemon({"cmd": "send", "signal_id": signal_id, "repeat": repeat, "priority": priority})
+        if response is not None:
+            return response["success"], response["message"]
+
+        signal, device = await self.get_signal_by_id(signal_id)
+        if not signal:
+            return False, f"Signal with ID '{signal_id}' not found"
+
+        return await self._send(signal, self.ir_manager._identify(signal, device), device.get("hub_mac"), repeat, priority)
+
+    async def send_signals_by_id(self, signal_ids):
+        """Send several signals; hubs run concurrently, order is kept within each hub
+
+        Returns:
+            list: A (success, message) tuple per signal ID, in input order
+        """
+        response = await self._daemon({"cmd": "send_many", "signal_ids": signal_ids})
+        if response is not None and "results" in response:
+            return [(result["success"], result["message"]) for result in response["results"]]
+        if response is not None:
+            return [(False, response["message"])] * len(signal_ids)
+
+        results = [None] * len(signal_ids)
+        groups = {}
+        for index, signal_id in enumerate(signal_ids):
+            signal, device = await self.get_signal_by_id(signal_id)
+            if not signal:
+                results[index] = (False, f"Signal with ID '{signal_id}' not found")
+                continue
+            groups.setdefault(device.get("hub_mac"), []).append(
+                (index, signal, self.ir_manager._identify(signal, device))
+            )
+
+        async def send_group(hub_mac, items):
+            for index, signal, identifier in items:
+                results[index] = await self._send(signal, identifier, hub_mac)
+
+        await asyncio.gather(*(send_group(hub_mac, items) for hub_mac, items in groups.items()))
+        return results
+
+    async def _daemon(self, request):
+        """Run a request on the hub daemon; None when use_daemon is off or no daemon is listening"""
+        if not self.use_daemon:
+            return None
+        return await self._run(daemon_request, request)
+
+    async def _send(self, signal, identifier, hub_mac, repeat=1, priority=PRIORITY_INTERACTIVE):
+        return await self._run(self.ir_manager._send_signal_data, signal, identifier, hub_mac, repeat, priority)
+
+    async def learn_signal(self, device_name, signal_name, signal_description="", device_description="", hub_mac=None,
+                           timeout=LEARN_TIMEOUT, progress=None):
+        """Learn and save an IR signal without blocking the loop during capture
+
+        Cancelling the awaiting task stops the capture thread at its next poll.
+        """
+        device = await self.get_device(device_name)
+        if device:
+            hub_mac = hub_mac or device.get("hub_mac")
+
+        # Only the hub is held while waiting for the button press; the catalog stays available
+        cancel_event = threading.Event()
+        async with self._hub_lock(hub_mac):
+            try:
+                packet, learned_on, error = await self._run(
+                    self.ir_manager.capture_packet, hub_mac, timeout, progress, cancel_event
+                )
+            except asyncio.CancelledError:
+                cancel_event.set()
+                raise
+        if packet is None:
+            return False, error
+
+        return await self._catalog(
+            self.ir_manager.save_learned_signal,
+            device_name, signal_name, packet, signal_description, device_description, learned_on
+        )
+
+    async def learn_rf_signal(self, device_name, signal_name, signal_description="", device_description="", hub_mac=None,
+                              timeout=LEARN_TIMEOUT, progress=None, on_frequency=None):
+        """Learn and save an RF signal (frequency sweep, then capture) without blocking the loop"""
+        device = await self.get_device(device_name)
+        if device:
+            hub_mac = hub_mac or device.get("hub_mac")
+
+        cancel_event = threading.Event()
+        async with self._hub_lock(hub_mac):
+            try:
+                packet, learned_on, frequency, error = await self._run(
+                    self.ir_manager.capture_rf_packet, hub_mac, timeout, progress, cancel_event, on_frequency
+                )
+            except asyncio.CancelledError:
+                cancel_event.set()
+                raise
+        if packet is None:
+            return False, error
+
+        return await self._catalog(
+            self.ir_manager.save_learned_signal,
+            device_name, signal_name, packet, signal_description, device_description, learned_on, "rf", frequency
+        )
+
+    async def close(self):
+        """Wait for in-flight work and release the thread pool"""
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown, True)
@@ -0,0 +1,35 @@
+import os
+import mmap
+import hashlib
+
+class BlobStore:
+    """Content-addressed directory of raw signal payloads, named by their SHA-256"""
+
+    def __init__(self, folder):
+        self.blob_dir = os.path.join(folder, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    def path_for(self, blob_hash):
+        return os.path.join(self.blob_dir, blob_hash)
+
+    def put(self, data):
+        """Store data and return its hash; identical payloads are written only once"""
+        blob_hash = hashlib.sha256(data).hexdigest()
+        path = self.path_for(blob_hash)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return blob_hash
+
+    def get(self, blob_hash):
+        """Read a payload by hash through mmap"""
+        with open(self.path_for(blob_hash), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:]
+
+    def exists(self, blob_hash):
+        return os.path.exists(self.path_for(blob_hash))
@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import threading
+import broadlink
+
+# Direct connects go to a known host, so don't wait as long as a broadcast would
+DIRECT_CONNECT_TIMEOUT = 2
+
+class HubCache:
+    """Persists discovered hubs in signals/hubs.json so we can reconnect without a broadcast
+
+    Records are keyed by the hub's MAC address (hex) and hold its host, port,
+    devtype and when it was last seen.
+    """
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, "hubs.json")
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def load(self):
+        """Return the cached records keyed by MAC"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save(self, devices):
+        """Record (or update) the given authenticated broadlink devices"""
+        with self.lock:
+            records = self.load()
+            for device in devices:
+                host, port = device.host
+                records[device.mac.hex()] = {
+                    "host": host,
+                    "port": port,
+                    "devtype": device.devtype,
+                    "name": getattr(device, "name", ""),
+                    "last_seen": time.time()
+                }
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(records, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def connect(self, mac=None):
+        """Connect and authenticate directly to a cached hub
+
+        Args:
+            mac: MAC (hex) of the hub to connect to; defaults to the most recently seen one
+
+        Returns:
+            The authenticated broadlink device, or None if there is no record or it didn't answer
+        """
+        records = self.load()
+        if mac is None:
+            if not records:
+                return None
+            mac = max(records, key=lambda key: records[key].get("last_seen", 0))
+        record = records.get(mac)
+        if not record:
+            return None
+
+        try:
+            device = broadlink.gendevice(record["devtype"], (record["host"], record["port"]), bytes.fromhex(mac))
+            default_timeout = device.timeout
+            device.timeout = DIRECT_CONNECT_TIMEOUT
+            device.auth()
+            device.timeout = default_timeout
+            return device
+        except Exception:
+            return None
+
+    def refresh_in_background(self):
+        """Re-run a broadcast discovery off the hot path so changed IPs get picked up"""
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+        threading.Thread(target=self._refresh, daemon=True).start()
+
+    def _refresh(self):
+        try:
+            discovered_devices = broadlink.discover(timeout=5)
+            if discovered_devices:
+                self.save(discovered_devices)
+        except Exception:
+            pass
+        finally:
+            with self.lock:
+                self.refreshing = False
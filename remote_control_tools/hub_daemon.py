@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Long-lived hub daemon.
+
+Discovers and authenticates with the Broadlink hub once, then serves send,
+learn and list requests over a Unix domain socket so the CLI tools and the
+agent tool don't pay for discovery on every command.
+
+Protocol: the client writes one JSON object per line and reads one JSON
+object back, e.g. {"cmd": "send", "signal_id": "..."}. Sends take an optional
+"priority" (see send_queue), "send" an optional "coalesce" and "send_many"
+optional "delays" (seconds) and "timed"; {"cmd": "stats"} reports each hub's
+send queue, health state and RTT. The agent and scenes send through here when
+the daemon is running, so every process's sends share one queue per hub.
+"""
+import os
+import sys
+import json
+import socket
+import socketserver
+import tempfile
+import threading
+from rich.console import Console
+from send_queue import PRIORITY_INTERACTIVE
+from learn_timeouts import LEARN_TIMEOUT
+
+console = Console()
+
+SOCKET_PATH = os.environ.get("IR_DAEMON_SOCKET", os.path.join(tempfile.gettempdir(), "rm4pro-hubd.sock"))
+
+# How long a client waits for a send or list reply; a hub reconnect fits well inside it
+CLIENT_TIMEOUT = 50
+
+# Added on top of the time a learn or a delayed batch may take by design, for the reconnect and the save
+CLIENT_TIMEOUT_MARGIN = 10
+
+def request_timeout(request):
+    """Seconds a client waits for the daemon's reply to request
+
+    Learning waits on a human pressing a button (twice for RF: the frequency
+    sweep, then the capture, each up to the request's timeout), so the client
+    must outlast the daemon or it gives up while the capture still gets saved.
+    """
+    cmd = request.get("cmd")
+    if cmd == "learn":
+        presses = 2 if request.get("signal_type") == "rf" else 1
+        return presses * request.get("timeout", LEARN_TIMEOUT) + CLIENT_TIMEOUT_MARGIN
+    if cmd == "send_many":
+        return CLIENT_TIMEOUT + sum(request.get("delays") or [])
+    return CLIENT_TIMEOUT
+
+def daemon_request(request, socket_path=SOCKET_PATH, timeout=None):
+    """Send one request to the daemon
+
+    Args:
+        timeout: Socket timeout in seconds; defaults to request_timeout(request)
+
+    Returns:
+        dict: The daemon's response, or None when no daemon is listening
+    """
+    if not os.path.exists(socket_path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout or request_timeout(request))
+            sock.connect(socket_path)
+            sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            with sock.makefile("r", encoding="utf-8") as f:
+                line = f.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+    except OSError as e:
+        return {"success": False, "message": f"Hub daemon request failed: {e}"}
+
+    if not line:
+        return {"success": False, "message": "Hub daemon closed the connection without replying"}
+    return json.loads(line)
+
+class HubDaemon:
+    """Owns one authenticated IRManager and runs requests against it"""
+
+    def __init__(self, folder="signals", socket_path=SOCKET_PATH):
+        from ir_manager import IRManager
+
+        self.socket_path = socket_path
+        self.ir_manager = IRManager(folder=folder)
+        self.ir_manager.start_health_monitor()
+        self.lock = threading.Lock()  # Learning and catalog requests run one at a time; sends are ordered by the send queues
+        self.server = None
+
+    def handle_request(self, request):
+        """Dispatch a decoded request and return the response dict"""
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            return {"success": True, "message": "pong"}
+        if cmd == "stats":
+            return {
+                "success": True,
+                "message": "OK",
+                "send_queues": self.ir_manager.send_queue_stats(),
+                "hubs": self.ir_manager.hub_health_stats()
+            }
+
+        # Sends skip the daemon lock so the hub's send queue can put interactive ones first;
+        # IRManager's catalog lock keeps their lookups safe from a concurrent learn or reload
+        priority = request.get("priority", PRIORITY_INTERACTIVE)
+        if cmd == "send":
+            success, message = self.ir_manager.send_signal_by_id(
+                request["signal_id"], request.get("repeat", 1), priority, request.get("coalesce", False)
+            )
+            return {"success": success, "message": message}
+        if cmd == "send_many":
+            results = self.ir_manager.send_signals_by_id(
+                request["signal_ids"], request.get("delays"), request.get("timed", False), priority
+            )
+            return {
+                "success": all(result[0] for result in results),
+                "message": f"Sent {sum(result[0] for result in results)}/{len(results)} signals",
+                "results": [
+                    dict(zip(("success", "message", "started", "duration"), result)) for result in results
+                ]
+            }
+        if cmd == "macro":
+            options = {"gap": request["gap"]} if "gap" in request else {}
+            success, message = self.ir_manager.send_macro(request["signal_ids"], **options)
+            return {"success": success, "message": message}
+        if cmd == "send_by_name":
+            success, message = self.ir_manager.send_signal(
+                request["device_name"], request["signal_name"], request.get("repeat", 1), priority
+            )
+            return {"success": success, "message": message}
+
+        with self.lock:
+            if cmd == "learn":
+                learn = self.ir_manager.learn_rf_signal if request.get("signal_type") == "rf" else self.ir_manager.learn_signal
+                success, message = learn(
+                    request["device_name"],
+                    request["signal_name"],
+                    request.get("signal_description", ""),
+                    request.get("device_description", ""),
+                    timeout=request.get("timeout", LEARN_TIMEOUT)
+                )
+                return {"success": success, "message": message}
+            if cmd == "list":
+                return {"success": True, "message": "OK", "devices": self.ir_manager.get_devices()}
+        return {"success": False, "message": f"Unknown command '{cmd}'"}
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            if daemon_request({"cmd": "ping"}, self.socket_path, timeout=1) is not None:
+                raise RuntimeError(f"A hub daemon is already listening on {self.socket_path}")
+            # Left behind by a daemon that didn't shut down cleanly
+            os.unlink(self.socket_path)
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                if not line:
+                    return
+                try:
+                    response = daemon.handle_request(json.loads(line))
+                except Exception as e:
+                    response = {"success": False, "message": f"Hub daemon error: {e}"}
+                self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self.server.daemon_threads = True
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        if self.server:
+            self.server.shutdown()
+
+def main():
+    with console.status("[bold blue]Authenticating with Broadlink device...[/bold blue]"):
+        daemon = HubDaemon()
+
+    if daemon.ir_manager.device is None:
+        console.print("[yellow]No hub connected yet; the daemon will retry on the first request.[/yellow]")
+    console.print(f"[bold green]✅ Hub daemon listening on {daemon.socket_path}[/bold green]")
+    daemon.serve_forever()
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        console.print("\n[bold yellow]Hub daemon stopped.[/bold yellow]")
+    except Exception as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+        sys.exit(1)
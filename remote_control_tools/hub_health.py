@@ -0,0 +1,133 @@
+import time
+import random
+import threading
+
+# How often the monitor re-authenticates each hub to keep its session fresh
+KEEPALIVE_INTERVAL = 60
+
+# How often the monitor wakes up to look for due keepalives and retries
+MONITOR_TICK = 1
+
+# Consecutive failures before the breaker opens and callers fail fast
+FAILURE_THRESHOLD = 3
+
+# Reconnect backoff while a hub is down: BACKOFF_BASE * 2^n seconds, capped, with jitter
+BACKOFF_BASE = 2
+BACKOFF_MAX = 300
+
+# Round trips slower than this (smoothed) count as degraded
+DEGRADED_RTT = 0.5
+
+# Weight of the newest sample in the smoothed RTT
+RTT_SMOOTHING = 0.3
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+DOWN = "down"
+
+class HubHealth:
+    """Health and circuit breaker of one hub
+
+    A hub is healthy after a successful round trip, degraded after a failure
+    or when its smoothed RTT is slow, and down once FAILURE_THRESHOLD
+    failures in a row open the breaker. While down, allow() refuses callers
+    until the backoff elapses, then lets a single attempt through; its
+    outcome closes the breaker or reopens it with the next, longer backoff.
+    """
+
+    def __init__(self, mac):
+        self.mac = mac
+        self.lock = threading.Lock()
+        self.state = HEALTHY
+        self.failures = 0
+        self.attempts = 0  # Reconnect attempts since the breaker opened, for the backoff
+        self.retry_at = 0.0
+        self.rtt = None  # Smoothed seconds
+        self.last_rtt = None
+        self.last_error = None
+        self.last_check = time.monotonic()
+
+    def allow(self):
+        """True if a caller may use the hub now"""
+        with self.lock:
+            if self.state != DOWN:
+                return True
+            now = time.monotonic()
+            if now < self.retry_at:
+                return False
+            # Half-open: this caller gets the trial, the rest keep failing fast until it reports back
+            self.retry_at = now + BACKOFF_BASE
+            return True
+
+    def retry_in(self):
+        with self.lock:
+            return max(self.retry_at - time.monotonic(), 0.0)
+
+    def record_success(self, rtt=None):
+        with self.lock:
+            self.failures = 0
+            self.attempts = 0
+            self.retry_at = 0.0
+            self.last_error = None
+            self.last_check = time.monotonic()
+            if rtt is not None:
+                self.last_rtt = rtt
+                self.rtt = rtt if self.rtt is None else RTT_SMOOTHING * rtt + (1 - RTT_SMOOTHING) * self.rtt
+            self.state = DEGRADED if self.rtt is not None and self.rtt > DEGRADED_RTT else HEALTHY
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self.last_check = time.monotonic()
+            if self.failures < FAILURE_THRESHOLD:
+                self.state = DEGRADED
+                return
+            self.state = DOWN
+            backoff = min(BACKOFF_BASE * 2 ** self.attempts, BACKOFF_MAX)
+            self.attempts += 1
+            # Jitter so several hubs (or processes) don't retry in lockstep
+            self.retry_at = self.last_check + random.uniform(backoff / 2, backoff)
+
+    def status(self):
+        """State and RTT for reporting"""
+        with self.lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "rtt_ms": round(self.rtt * 1000, 1) if self.rtt is not None else None,
+                "last_rtt_ms": round(self.last_rtt * 1000, 1) if self.last_rtt is not None else None,
+                "retry_in": round(max(self.retry_at - time.monotonic(), 0.0), 1) if self.state == DOWN else None,
+                "last_error": self.last_error
+            }
+
+class HubMonitor:
+    """Background thread that keeps every known hub's session alive
+
+    Healthy hubs get a keepalive (re-auth) every interval seconds; hubs that
+    are down get a reconnect attempt whenever their backoff allows one.
+    """
+
+    def __init__(self, ir_manager, interval=KEEPALIVE_INTERVAL):
+        self.ir_manager = ir_manager
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="hub-monitor", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(MONITOR_TICK):
+            for mac in self.ir_manager.known_hub_macs():
+                health = self.ir_manager.hub_health(mac)
+                if health.state == DOWN:
+                    if health.allow():
+                        self.ir_manager.check_hub(mac)
+                elif time.monotonic() - health.last_check >= self.interval:
+                    self.ir_manager.check_hub(mac)
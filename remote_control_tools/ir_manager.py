@@ -1,320 +1,946 @@
 import os
-import json
 import base64
 import broadlink
+from broadlink.exceptions import ReadError, StorageError
 import time
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from signal_registry import SignalRegistry
+from signal_store import create_signal_store
+from blob_store import BlobStore
+from packet_cache import PacketCache, SendCounter, PREFILL_COUNT
+from hub_cache import HubCache
+from packet_format import repeat_chunks
+from macro_compiler import MacroCompiler, MACRO_GAP
+from send_queue import SendQueue, PRIORITY_INTERACTIVE, MIN_SEND_GAP, COALESCE_WINDOW
+from hub_health import HubHealth, HubMonitor, DOWN, KEEPALIVE_INTERVAL
+from learn_timeouts import LEARN_TIMEOUT, LEARN_POLL_INTERVAL
+
+# Per-button wait when learning a whole remote; the user is already at the remote, ready to press
+BULK_LEARN_TIMEOUT = 10
+
+# Times a button is re-prompted when it captures the previous button's code (usually a held button repeating)
+BULK_DUPLICATE_RETRIES = 1
+
+# Buffered bulk-learn captures are written to the store this often
+BULK_CHECKPOINT = 10
+
+# What check_data raises while the hub hasn't captured anything yet
+NO_PACKET_YET = (ReadError, StorageError)
+
+# Canned packet used by add_test_signal
+TEST_SIGNAL_DATA = "JgBoAWJhYo4SNRMSETYRFBESEjUTNBMSEhMRExETEhITEhI1EjURFBESExISEhM1EhIRExI1EhMSEhITERITEhISExIRFBESEhMSNRI1EjUSNRMSERMSNhESEjUTEhISEhMRExISEhMSEhISEhMSEhITERMSEhISExISExE2ERITEhISExIRFBESExISEhITERMSEhITEhISEhISExISExETEhISEhMSEhMREhITEhITEhETEhISExISERQREhMSEhMSEhETEhITEhISEhMRExISEjUTEhETEjYREhITEjUSNRITETYRNhE2ERMSNRI1EhITNRI1EjUSEhITERMSEhITEhISEhITEjUSEhMSERMSEhITEhIRFBESExISEhMSERMSEhMSEhISExETEhISExETEhISEhMSEhMRExISEhITEhEUERISExISExIREhMSEhMSEhEUERITEhITETYRNhETEjYRNRI1EgANBQ=="
 
 class IRManager:
-    def __init__(self, folder="signals"):
+    def __init__(self, folder="signals", storage=None, min_send_gap=MIN_SEND_GAP, coalesce_window=COALESCE_WINDOW):
         self.folder = folder
         self.json_path = os.path.join(folder, "devices.json")
         os.makedirs(folder, exist_ok=True)
-        self.device = None
+        # "json" or "sqlite"; IR_STORAGE lets the CLI tools pick a backend too
+        self.store = create_signal_store(storage or os.environ.get("IR_STORAGE", "json"), folder)
+        self.blobs = BlobStore(folder)  # Signal payloads, referenced by signal_hash
+        self.device = None  # Default hub, used for devices that aren't bound to one
+        self.default_mac = None  # Kept while the default hub's session is being replaced
+        self.hubs = {}  # Authenticated hubs keyed by MAC (hex)
+        self.hub_locks = {}  # One send at a time per hub
+        self.send_queues = {}  # Prioritized, paced sends per hub; see SendQueue
+        self.min_send_gap = min_send_gap
+        self.coalesce_window = coalesce_window
+        self.connect_lock = threading.RLock()
+        self.health = {}  # HubHealth per hub MAC (None while no hub is known)
+        self.monitor = None
+        # Guards devices_cache and the registry: sends look signals up while learning or a
+        # revalidation rebuilds the indexes, so reads take it too (never held while sending)
+        self.catalog_lock = threading.RLock()
         self.devices_cache = None  # Cache for devices data
+        self.registry = SignalRegistry()  # Hash indexes over devices_cache
+        self.packet_cache = PacketCache()  # Decoded packets by signal ID
+        self.send_counter = SendCounter(folder)
+        self.hub_cache = HubCache(folder)  # Last known hub address for direct reconnects
+        self.macros = MacroCompiler(self)
+        self._prefill_packet_cache()
         self.discover_and_auth()
         
     def discover_and_auth(self):
-        """Discover and authenticate with the Broadlink device"""
-        try:
-            discovered_devices = broadlink.discover(timeout=5)
-            if discovered_devices:
-                self.device = discovered_devices[0]
-                self.device.auth()
-                return True, "Successfully authenticated with Broadlink device"
+        """Discover and authenticate with every Broadlink hub on the network"""
+        with self.connect_lock:
+            # Reconnect straight to the known hubs; broadcast only if none of them answer
+            known_macs = list(self.hub_cache.load())
+            if known_macs:
+                with ThreadPoolExecutor(max_workers=len(known_macs)) as executor:
+                    connected = [hub for hub in executor.map(self.hub_cache.connect, known_macs) if hub]
+                if connected:
+                    self._set_hubs(connected)
+                    self.hub_cache.refresh_in_background()
+                    return True, self._auth_message()
+            
+            try:
+                discovered_devices = broadlink.discover(timeout=5)
+                if not discovered_devices:
+                    return False, "No Broadlink devices found"
+                
+                authenticated = []
+                for hub in discovered_devices:
+                    try:
+                        hub.auth()
+                        authenticated.append(hub)
+                    except Exception as e:
+                        print(f"Failed to authenticate with hub {hub.mac.hex()}: {e}")
+                if not authenticated:
+                    return False, "Failed to authenticate with any Broadlink device"
+                
+                self._set_hubs(authenticated)
+                self.hub_cache.save(authenticated)
+                return True, self._auth_message()
+            except Exception as e:
+                return False, f"Failed to discover or authenticate with Broadlink device: {e}"
+    
+    def _set_hubs(self, hubs):
+        """Replace the hub registry; the first hub becomes the default"""
+        self.hubs = {hub.mac.hex(): hub for hub in hubs}
+        for mac in self.hubs:
+            self.hub_locks.setdefault(mac, threading.Lock())
+        self.device = hubs[0]
+        self.default_mac = self.device.mac.hex()
+    
+    def _auth_message(self):
+        if len(self.hubs) == 1:
+            return "Successfully authenticated with Broadlink device"
+        return f"Successfully authenticated with {len(self.hubs)} Broadlink devices"
+    
+    def _get_hub(self, hub_mac=None):
+        """Return (hub, error) for hub_mac, or the default hub when hub_mac is None"""
+        with self.connect_lock:
+            if hub_mac is None:
+                if self.device is None:
+                    success, message = self.discover_and_auth()
+                    if not success:
+                        return None, message
+                return self.device, None
+            
+            hub = self.hubs.get(hub_mac)
+            if hub is None:
+                hub = self.hub_cache.connect(hub_mac)
+                if hub is not None:
+                    self.hubs[hub_mac] = hub
+                    self.hub_locks.setdefault(hub_mac, threading.Lock())
+                else:
+                    self.discover_and_auth()
+                    hub = self.hubs.get(hub_mac)
+            if hub is None:
+                return None, f"Hub {hub_mac} is not reachable"
+            return hub, None
+    
+    def _reconnect_hub(self, hub_mac=None):
+        """Drop a hub's session and connect to it again"""
+        with self.connect_lock:
+            if hub_mac is None:
+                self.device = None
             else:
-                return False, "No Broadlink devices found"
+                self.hubs.pop(hub_mac, None)
+        return self._get_hub(hub_mac)
+    
+    def list_hubs(self):
+        """Known hubs with their address, whether we hold a session and their health state"""
+        records = self.hub_cache.load()
+        default_mac = self.device.mac.hex() if self.device is not None else None
+        return [{
+            "mac": mac,
+            "host": record.get("host"),
+            "name": record.get("name", ""),
+            "connected": mac in self.hubs,
+            "default": mac == default_mac,
+            "state": self.hub_health(mac).state
+        } for mac, record in records.items()]
+    
+    def hub_health(self, mac):
+        """The HubHealth tracking mac, created on first use"""
+        health = self.health.get(mac)
+        if health is None:
+            health = self.health.setdefault(mac, HubHealth(mac))
+        return health
+    
+    def known_hub_macs(self):
+        return [mac for mac in set(self.hubs) | set(self.health) if mac is not None]
+    
+    def check_hub(self, mac):
+        """Keepalive: re-authenticate the hub's session, reconnecting directly if that fails
+
+        Updates the hub's health and RTT. Never broadcasts, so it is cheap enough to run periodically.
+        """
+        health = self.hub_health(mac)
+        started = time.monotonic()
+        try:
+            hub = self.hubs.get(mac)
+            if hub is None:
+                raise ConnectionError(f"No session with hub {mac}")
+            with self.hub_locks.setdefault(mac, threading.Lock()):
+                hub.auth()
         except Exception as e:
-            return False, f"Failed to discover or authenticate with Broadlink device: {e}"
+            started = time.monotonic()
+            hub = self.hub_cache.connect(mac)
+            if hub is None:
+                health.record_failure(e)
+                return False
+        
+        with self.connect_lock:
+            self.hubs[mac] = hub
+            self.hub_locks.setdefault(mac, threading.Lock())
+            if mac == self.default_mac:
+                self.device = hub
+        health.record_success(time.monotonic() - started)
+        return True
+    
+    def start_health_monitor(self, interval=KEEPALIVE_INTERVAL):
+        """Keep hub sessions alive from a background thread; for long-running processes"""
+        if self.monitor is None:
+            self.monitor = HubMonitor(self, interval)
+            self.monitor.start()
+        return self.monitor
+    
+    def hub_health_stats(self):
+        """State, failure count and RTT of each hub, keyed by MAC"""
+        return {mac: self.hub_health(mac).status() for mac in self.known_hub_macs()}
+    
+    def bind_device_to_hub(self, device_name, hub_mac):
+        """Route a device's signals through a specific hub (None to use the default hub)"""
+        with self.catalog_lock:
+            devices_data = self.get_devices()
+            device = self.registry.get_device(device_name)
+            if not device:
+                return False, f"Device '{device_name}' not found"
+        
+            if hub_mac:
+                device["hub_mac"] = hub_mac
+            else:
+                device.pop("hub_mac", None)
+        
+            if self._persist(self.store.save_device, devices_data, device):
+                return True, f"Device '{device_name}' now sends through hub {hub_mac or 'default'}"
+            else:
+                return False, f"Failed to save device '{device_name}'"
     
     def get_devices(self):
-        """Get all devices from cache or JSON file"""
-        # Return cached devices if available
-        if self.devices_cache is not None:
-            return self.devices_cache
+        """Get all devices from cache or the signal store"""
+        with self.catalog_lock:
+            # Return cached devices if available, after a cheap check that no other process changed the store
+            if self.devices_cache is not None:
+                self._revalidate()
+                return self.devices_cache
             
-        # Otherwise load from file
-        if not os.path.exists(self.json_path):
-            self.devices_cache = []
-            return []
+            # Otherwise load from the store
+            self.devices_cache = self.store.load()
+            if self._externalize_payloads(self.devices_cache):
+                # One-time migration of inline signal_data into the blob store
+                self._persist(self.store.save_all, self.devices_cache)
+            self.registry.rebuild(self.devices_cache)
+            return self.devices_cache
+    
+    def _revalidate(self):
+        """Pick up changes another process made to the store since we loaded it"""
+        refreshed = self.store.poll(self.devices_cache)
+        if refreshed is None:
+            return
         
-        try:
-            with open(self.json_path, "r") as f:
-                self.devices_cache = json.load(f)
-                return self.devices_cache
-        except Exception:
-            self.devices_cache = []
-            return []
+        # The registry still holds the old signal dicts, so compare hashes before re-indexing
+        old_hashes = {signal_id: signal.get("signal_hash")
+                      for signal_id, (signal, _) in self.registry.signals_by_id.items()}
+        self.devices_cache = refreshed
+        self.registry.rebuild(refreshed)
+        for signal_id, old_hash in old_hashes.items():
+            signal, _ = self.registry.get_signal_by_id(signal_id)
+            if not signal or signal.get("signal_hash") != old_hash:
+                self.packet_cache.invalidate(signal_id)
     
     def get_device(self, device_name):
         """Get a specific device by name"""
-        devices = self.get_devices()
-        for device in devices:
-            if device["device_name"] == device_name:
-                return device
-        return None
+        with self.catalog_lock:
+            self.get_devices()
+            return self.registry.get_device(device_name)
     
     def get_device_by_id(self, device_id):
         """Get a specific device by ID"""
-        devices = self.get_devices()
-        for device in devices:
-            if device.get("id") == device_id:
-                return device
-        return None
+        with self.catalog_lock:
+            self.get_devices()
+            return self.registry.get_device_by_id(device_id)
     
     def get_signal(self, device_name, signal_name):
         """Get a specific signal by device and signal name"""
-        device = self.get_device(device_name)
-        if not device:
-            return None
-            
-        for signal in device["signals"]:
-            if signal["signal_name"] == signal_name:
-                return signal
-        return None
+        with self.catalog_lock:
+            self.get_devices()
+            return self.registry.get_signal(device_name, signal_name)
     
     def get_signal_by_id(self, signal_id):
         """Get a specific signal by ID"""
-        devices = self.get_devices()
-        for device in devices:
-            for signal in device.get("signals", []):
-                if signal.get("id") == signal_id:
-                    return signal, device
-        return None, None
+        with self.catalog_lock:
+            self.get_devices()
+            return self.registry.get_signal_by_id(signal_id)
     
     def save_devices(self, devices_data):
-        """Save devices data to JSON file and update cache"""
-        # Update the cache
-        self.devices_cache = devices_data
+        """Save devices data to the signal store and update cache"""
+        with self.catalog_lock:
+            # Callers may have mutated the list in any way, so re-index everything
+            self.registry.rebuild(devices_data)
+            self.packet_cache.clear()
+            self.devices_cache = devices_data
+            return self._persist(self.store.save_all, devices_data)
+    
+    def _externalize_payloads(self, devices_data):
+        """Move inline base64 signal_data into the blob store; returns True if anything moved"""
+        moved = False
+        for device in devices_data:
+            for signal in device.get("signals", []):
+                if signal.get("signal_data"):
+                    signal["signal_hash"] = self.blobs.put(base64.b64decode(signal["signal_data"]))
+                    moved = True
+                signal.pop("signal_data", None)
+        return moved
+    
+    def _load_packet(self, signal):
+        """Load a signal's raw packet, from the LRU cache when possible"""
+        signal_id = signal.get("id")
+        packet = self.packet_cache.get(signal_id) if signal_id else None
+        if packet is not None:
+            return packet
         
-        # Save to file
+        if signal.get("signal_hash"):
+            packet = self.blobs.get(signal["signal_hash"])
+        else:
+            packet = base64.b64decode(signal["signal_data"])
+        
+        if signal_id:
+            self.packet_cache.put(signal_id, packet)
+        return packet
+    
+    def _prefill_packet_cache(self):
+        """Warm the packet cache with the most frequently sent signals"""
+        for signal_id in self.send_counter.most_sent(PREFILL_COUNT):
+            signal, _ = self.get_signal_by_id(signal_id)
+            if not signal:
+                continue
+            try:
+                self._load_packet(signal)
+            except Exception:
+                pass
+    
+    def _persist(self, store_method, *args):
+        """Run a store write, reporting failures the same way for every backend"""
         try:
-            with open(self.json_path, "w") as f:
-                json.dump(devices_data, f, indent=2)
+            store_method(*args)
             return True
         except Exception as e:
             print(f"Error saving devices: {e}")
             return False
+    
+    def delete_device(self, device_name):
+        """Delete a device and all of its signals"""
+        with self.catalog_lock:
+            devices_data = self.get_devices()
+            device = self.registry.get_device(device_name)
+            if not device:
+                return False, f"Device '{device_name}' not found"
+        
+            devices_data.remove(device)
+            self.registry.remove_device(device)
+            for signal in device.get("signals", []):
+                self.packet_cache.invalidate(signal["id"])
+                self.send_counter.forget(signal["id"])
+        
+            if self._persist(self.store.delete_device, devices_data, device):
+                return True, f"Device '{device_name}' deleted successfully."
+            else:
+                return False, f"Failed to delete device '{device_name}'"
+    
+    def delete_signal(self, device_name, signal_name):
+        """Delete a single signal from a device"""
+        with self.catalog_lock:
+            self.get_devices()
+            device = self.registry.get_device(device_name)
+            signal = self.registry.get_signal(device_name, signal_name)
+            if not device or not signal:
+                return False, f"Signal '{device_name}.{signal_name}' not found"
+        
+            device["signals"].remove(signal)
+            self.registry.remove_signal(device, signal)
+            self.packet_cache.invalidate(signal["id"])
+            self.send_counter.forget(signal["id"])
+        
+            if self._persist(self.store.delete_signal, self.devices_cache, device, signal):
+                return True, f"Signal '{device_name}.{signal_name}' deleted successfully."
+            else:
+                return False, f"Failed to delete signal '{device_name}.{signal_name}'"
             
-    def create_device(self, device_name, device_description=""):
+    def create_device(self, device_name, device_description="", hub_mac=None):
         """Create a new device without learning a signal"""
-        # Load existing devices
-        devices_data = self.get_devices()
+        with self.catalog_lock:
+            # Load existing devices
+            devices_data = self.get_devices()
         
-        # Check if device already exists
-        for device in devices_data:
-            if device["device_name"] == device_name:
+            # Check if device already exists
+            if self.registry.get_device(device_name):
                 return False, f"Device '{device_name}' already exists"
         
-        # Add new device with UUID
-        new_device = {
-            "id": str(uuid.uuid4()),
-            "device_name": device_name,
-            "device_description": device_description,
-            "signals": []
-        }
+            # Add new device with UUID
+            new_device = {
+                "id": str(uuid.uuid4()),
+                "device_name": device_name,
+                "device_description": device_description,
+                "signals": []
+            }
+            if hub_mac:
+                new_device["hub_mac"] = hub_mac
         
-        devices_data.append(new_device)
+            devices_data.append(new_device)
+            self.registry.add_device(new_device)
         
-        # Save updated data
-        if self.save_devices(devices_data):
-            return True, f"Successfully created device '{device_name}'"
-        else:
-            return False, f"Failed to save device '{device_name}'"
+            # Save updated data
+            if self._persist(self.store.save_device, devices_data, new_device):
+                return True, f"Successfully created device '{device_name}'"
+            else:
+                return False, f"Failed to save device '{device_name}'"
     
     def add_test_signal(self, device_name, signal_name, signal_description=""):
         """Add a test signal to an existing device (for testing purposes)"""
-        # Load existing devices
-        devices_data = self.get_devices()
+        with self.catalog_lock:
+            # Load existing devices
+            devices_data = self.get_devices()
         
-        # Find device
-        device_found = False
-        for device in devices_data:
-            if device["device_name"] == device_name:
-                device_found = True
-                
-                # Check if signal already exists
-                for signal in device["signals"]:
-                    if signal["signal_name"] == signal_name:
-                        return False, f"Signal '{device_name}.{signal_name}' already exists"
-                
-                # Add new test signal with UUID
-                device["signals"].append({
-                    "id": str(uuid.uuid4()),
-                    "signal_name": signal_name,
-                    "signal_description": signal_description,
-                    "signal_data": "JgBoAWJhYo4SNRMSETYRFBESEjUTNBMSEhMRExETEhITEhI1EjURFBESExISEhM1EhIRExI1EhMSEhITERITEhISExIRFBESEhMSNRI1EjUSNRMSERMSNhESEjUTEhISEhMRExISEhMSEhISEhMSEhITERMSEhISExISExE2ERITEhISExIRFBESExISEhITERMSEhITEhISEhISExISExETEhISEhMSEhMREhITEhITEhETEhISExISERQREhMSEhMSEhETEhITEhISEhMRExISEjUTEhETEjYREhITEjUSNRITETYRNhE2ERMSNRI1EhITNRI1EjUSEhITERMSEhITEhISEhITEjUSEhMSERMSEhITEhIRFBESExISEhMSERMSEhMSEhISExETEhISExETEhISEhMSEhMRExISEhITEhEUERISExISExIREhMSEhMSEhEUERITEhITETYRNhETEjYRNRI1EgANBQ=="  # Test signal data
-                })
-                
-                # Save updated data
-                if self.save_devices(devices_data):
-                    return True, f"Successfully added test signal '{device_name}.{signal_name}'"
-                else:
-                    return False, f"Failed to save test signal '{device_name}.{signal_name}'"
-                
-        if not device_found:
-            return False, f"Device '{device_name}' not found"
+            # Find device
+            device = self.registry.get_device(device_name)
+            if not device:
+                return False, f"Device '{device_name}' not found"
+        
+            # Check if signal already exists
+            if self.registry.get_signal(device_name, signal_name):
+                return False, f"Signal '{device_name}.{signal_name}' already exists"
+        
+            # Add new test signal with UUID
+            new_signal = {
+                "id": str(uuid.uuid4()),
+                "signal_name": signal_name,
+                "signal_description": signal_description,
+                "signal_hash": self.blobs.put(base64.b64decode(TEST_SIGNAL_DATA))
+            }
+            device["signals"].append(new_signal)
+            self.registry.add_signal(device, new_signal)
+        
+            # Save updated data
+            if self._persist(self.store.save_signal, devices_data, device, new_signal):
+                return True, f"Successfully added test signal '{device_name}.{signal_name}'"
+            else:
+                return False, f"Failed to save test signal '{device_name}.{signal_name}'"
     
     def check_json_file(self):
-        """Check if the JSON file exists and is valid"""
-        if not os.path.exists(self.json_path):
-            return False, f"JSON file '{self.json_path}' does not exist"
-        
+        """Check that the selected store (snapshot and journal, or database) exists and is readable"""
         try:
-            with open(self.json_path, "r") as f:
-                content = f.read()
-                if not content.strip():
-                    return False, f"JSON file '{self.json_path}' is empty"
-                
-                # Try to parse the JSON
-                json.loads(content)
-                return True, f"JSON file '{self.json_path}' is valid"
-        except json.JSONDecodeError as e:
-            return False, f"JSON file '{self.json_path}' contains invalid JSON: {e}"
+            return self.store.check()
         except Exception as e:
-            return False, f"Error reading JSON file '{self.json_path}': {e}"
+            return False, f"Error checking the signal store: {e}"
     
-    def learn_signal(self, device_name, signal_name, signal_description="", device_description=""):
-        """Learn and save an IR signal"""
-        # Load existing devices
-        devices_data = self.get_devices()
+    def learn_signal(self, device_name, signal_name, signal_description="", device_description="", hub_mac=None,
+                     timeout=LEARN_TIMEOUT, progress=None, cancel_event=None):
+        """Learn and save an IR signal
+
+        Learning happens on hub_mac, else the hub the device is bound to, else the default hub.
+        See capture_packet for timeout, progress and cancel_event.
+        """
+        device = self.get_device(device_name)
+        if device:
+            hub_mac = hub_mac or device.get("hub_mac")
         
-        # Find or create device
-        device_found = False
-        for device in devices_data:
-            if device["device_name"] == device_name:
-                device_found = True
-                
-                # Update device description if provided and current is empty
-                if device_description and not device["device_description"]:
-                    device["device_description"] = device_description
-                
-                break
+        packet, learned_on, error = self.capture_packet(hub_mac, timeout, progress, cancel_event)
+        if packet is None:
+            return False, error
         
-        # Use the globally authenticated device if available
-        if self.device is None:
-            # If device is not available, try to discover and authenticate again
-            success, message = self.discover_and_auth()
-            if not success:
-                return False, message
+        return self.save_learned_signal(device_name, signal_name, packet, signal_description, device_description, learned_on)
+    
+    def capture_packet(self, hub_mac=None, timeout=LEARN_TIMEOUT, progress=None, cancel_event=None):
+        """Put a hub in learning mode and poll until a packet arrives
+
+        Args:
+            hub_mac: Hub to learn on, or None for the default hub
+            timeout: Seconds to wait for a button press
+            progress: Optional callable(elapsed, timeout) called on every poll, e.g. to update a spinner
+            cancel_event: Optional threading.Event; setting it stops waiting
+
+        Returns:
+            tuple: (packet, MAC of the hub that captured it, None) or (None, None, error message)
+        """
+        hub, error = self._enter_mode(hub_mac, "enter_learning")
+        if hub is None:
+            return None, None, error
+        
+        packet, error = self._poll_hub(hub.check_data, timeout, progress, cancel_event)
+        if packet is None:
+            return None, None, error
+        return packet, hub.mac.hex(), None
+    
+    def learn_rf_signal(self, device_name, signal_name, signal_description="", device_description="", hub_mac=None,
+                        timeout=LEARN_TIMEOUT, progress=None, cancel_event=None, on_frequency=None):
+        """Learn and save an RF signal; see capture_rf_packet"""
+        device = self.get_device(device_name)
+        if device:
+            hub_mac = hub_mac or device.get("hub_mac")
+        
+        packet, learned_on, frequency, error = self.capture_rf_packet(hub_mac, timeout, progress, cancel_event, on_frequency)
+        if packet is None:
+            return False, error
+        
+        return self.save_learned_signal(
+            device_name, signal_name, packet, signal_description, device_description, learned_on,
+            signal_type="rf", frequency=frequency
+        )
+    
+    def capture_rf_packet(self, hub_mac=None, timeout=LEARN_TIMEOUT, progress=None, cancel_event=None, on_frequency=None):
+        """Sweep for an RF remote's frequency, then capture its packet
+
+        The hub needs two presses: hold the button until the frequency is
+        found, then press it once more to record the packet. Each step gets
+        its own timeout. on_frequency(frequency) is called between the two so
+        the caller can prompt for the second press.
+
+        Returns:
+            tuple: (packet, hub MAC, frequency in MHz, None) or (None, None, None, error message)
+        """
+        hub, error = self._enter_mode(hub_mac, "sweep_frequency")
+        if hub is None:
+            return None, None, None, error
         
-        # Enter learning mode
+        captured = False
         try:
-            self.device.enter_learning()
+            frequency, error = self._poll_hub(
+                lambda: self._check_frequency(hub), timeout, progress, cancel_event
+            )
+            if frequency is None:
+                return None, None, None, error
+            if on_frequency:
+                on_frequency(frequency)
+            
+            try:
+                hub.find_rf_packet(frequency)
+            except Exception as e:
+                return None, None, None, f"Failed to start RF capture: {e}"
+            
+            packet, error = self._poll_hub(hub.check_data, timeout, progress, cancel_event)
+            if packet is None:
+                return None, None, None, error
+            captured = True
+            return packet, hub.mac.hex(), frequency, None
+        finally:
+            if not captured:
+                # Leave the hub out of sweep mode so IR learning and sending work again
+                try:
+                    hub.cancel_sweep_frequency()
+                except Exception:
+                    pass
+    
+    def _check_frequency(self, hub):
+        """The locked RF frequency, or None while the hub is still sweeping"""
+        found, frequency = hub.check_frequency()
+        return frequency if found else None
+    
+    def _enter_mode(self, hub_mac, mode):
+        """Call a hub's learning-mode method (enter_learning, sweep_frequency), reconnecting once on failure
+
+        Returns:
+            tuple: (hub, None) or (None, error message)
+        """
+        hub, error = self._get_hub(hub_mac)
+        if hub is None:
+            return None, error
+        if not hasattr(hub, mode):
+            return None, f"Hub {hub.mac.hex()} does not support {mode.replace('_', ' ')}"
+        
+        try:
+            getattr(hub, mode)()
         except Exception as e:
-            # If entering learning mode fails, try to rediscover and authenticate once
+            # If entering learning mode fails, try to reconnect once
             try:
-                success, message = self.discover_and_auth()
-                if not success:
-                    return False, message
+                hub, error = self._reconnect_hub(hub_mac)
+                if hub is None:
+                    return None, error
                 
-                self.device.enter_learning()
+                getattr(hub, mode)()
             except Exception as e2:
-                return False, f"Failed to enter learning mode: {e2}"
+                return None, f"Failed to enter learning mode: {e2}"
+        return hub, None
+    
+    def _poll_hub(self, check, timeout, progress=None, cancel_event=None):
+        """Call check every LEARN_POLL_INTERVAL until it returns something, the timeout passes or we're cancelled
+
+        Returns:
+            tuple: (result, None) or (None, error message)
+        """
+        started = time.monotonic()
+        while True:
+            if cancel_event is not None:
+                if cancel_event.wait(LEARN_POLL_INTERVAL):
+                    return None, "Learning cancelled"
+            else:
+                time.sleep(LEARN_POLL_INTERVAL)
+            
+            elapsed = time.monotonic() - started
+            if progress:
+                progress(elapsed, timeout)
+            
+            try:
+                result = check()
+                if result:
+                    return result, None
+            except NO_PACKET_YET:
+                pass
+            except Exception as e:
+                return None, f"Failed to capture signal: {e}"
+            
+            if elapsed >= timeout:
+                return None, f"No signal received within {timeout:.0f} seconds"
+    
+    def save_learned_signal(self, device_name, signal_name, packet, signal_description="", device_description="", hub_mac=None,
+                            signal_type="ir", frequency=None):
+        """Store a captured packet under device_name.signal_name, creating the device if needed"""
+        signal_meta = {"signal_type": signal_type, "frequency": frequency}
+        return self.save_learned_signals(
+            device_name, [(signal_name, packet, signal_description, signal_meta)], device_description, hub_mac
+        )
+    
+    def save_learned_signals(self, device_name, captures, device_description="", hub_mac=None):
+        """Store several captured packets for one device in a single store write
+
+        Args:
+            captures: List of (signal_name, packet, signal_description) tuples, optionally with a
+                fourth {"signal_type": "ir" | "rf", "frequency": MHz} dict (defaults to IR)
+        """
+        with self.catalog_lock:
+            # Load existing devices
+            devices_data = self.get_devices()
         
-        # Wait for signal
-        time.sleep(5)
-        try:
-            packet = self.device.check_data()
-            # Convert binary packet to base64 string for JSON storage
-            packet_base64 = base64.b64encode(packet).decode('utf-8')
-        except OSError as e:
-            if e.errno == -5:  # Storage full error
-                return False, "Device storage is full. Try resetting your Broadlink device by unplugging it for 10 seconds, then plugging it back in."
+            # Store the raw packets as blobs; the catalog only keeps their hashes
+            try:
+                hashes = [self.blobs.put(capture[1]) for capture in captures]
+            except Exception as e:
+                return False, f"Failed to store signal: {e}"
+        
+            device = self.registry.get_device(device_name)
+            if device:
+                # Update device description if provided and current is empty
+                if device_description and not device["device_description"]:
+                    device["device_description"] = device_description
             else:
-                return False, f"Failed to capture signal: {e}"
-        except Exception as e:
-            return False, f"Failed to capture signal: {e}"
-        
-        # Add or update signal
-        if device_found:
-            # Find device in the list
-            for device in devices_data:
-                if device["device_name"] == device_name:
-                    # Check if signal already exists
-                    signal_found = False
-                    for signal in device["signals"]:
-                        if signal["signal_name"] == signal_name:
-                            # Update existing signal
-                            signal["signal_data"] = packet_base64
-                            signal["signal_description"] = signal_description
-                            signal_found = True
-                            break
-                    
+                # Add new device with UUID
+                device = {
+                    "id": str(uuid.uuid4()),
+                    "device_name": device_name,
+                    "device_description": device_description,
+                    "signals": []
+                }
+                if hub_mac:
+                    # Bound to the hub that heard the remote, which is the one in the same room
+                    device["hub_mac"] = hub_mac
+                devices_data.append(device)
+                self.registry.add_device(device)
+        
+            # Add or update signals
+            signals = []
+            for capture, packet_hash in zip(captures, hashes):
+                signal_name, _, signal_description = capture[:3]
+                signal_meta = capture[3] if len(capture) > 3 else {}
+                signal = self.registry.get_signal(device_name, signal_name)
+                if signal:
+                    # Update existing signal and drop its stale cached packet
+                    self.packet_cache.invalidate(signal["id"])
+                    signal.pop("signal_data", None)
+                    signal["signal_hash"] = packet_hash
+                    signal["signal_description"] = signal_description
+                else:
                     # Add new signal if not found
-                    if not signal_found:
-                        device["signals"].append({
-                            "id": str(uuid.uuid4()),
-                            "signal_name": signal_name,
-                            "signal_description": signal_description,
-                            "signal_data": packet_base64
-                        })
+                    signal = {
+                        "id": str(uuid.uuid4()),
+                        "signal_name": signal_name,
+                        "signal_description": signal_description,
+                        "signal_hash": packet_hash
+                    }
+                    device["signals"].append(signal)
+                    self.registry.add_signal(device, signal)
+                signal["signal_type"] = signal_meta.get("signal_type") or "ir"
+                if signal_meta.get("frequency") is not None:
+                    signal["frequency"] = signal_meta["frequency"]
+                else:
+                    signal.pop("frequency", None)
+                signals.append(signal)
+        
+            # Save updated data
+            if not self._persist(self.store.save_signals, devices_data, device, signals):
+                if len(signals) == 1:
+                    return False, f"Failed to save '{device_name}.{captures[0][0]}'"
+                return False, f"Failed to save {len(signals)} signals for '{device_name}'"
+            if len(signals) == 1:
+                return True, f"Successfully saved '{device_name}.{captures[0][0]}'"
+            return True, f"Successfully saved {len(signals)} signals for '{device_name}'"
+    
+    def bulk_learn(self, device_name, template, device_description="", hub_mac=None, timeout=LEARN_TIMEOUT,
+                   checkpoint_every=BULK_CHECKPOINT, on_capture=None, progress=None, cancel_event=None):
+        """Learn a whole remote button after button, re-entering learning as soon as each capture lands
+
+        Captures are buffered and written in one store transaction every
+        checkpoint_every buttons and at the end, so a 40-button remote costs a
+        handful of writes instead of 40. Buttons that time out are skipped. A
+        capture identical to the previous button's is usually that button still
+        held down, so the button is asked for again (BULK_DUPLICATE_RETRIES
+        times) and then skipped. Ctrl+C stops early and keeps the captures.
+
+        Args:
+            template: Ordered list of (signal_name, signal_description) tuples
+            on_capture: Optional callable(index, signal_name, success, message) called after each button
+            progress: Optional callable(index, signal_name, elapsed, timeout) called on every poll
+
+        Returns:
+            tuple: (success, message) summarizing learned and skipped buttons
+        """
+        device = self.get_device(device_name)
+        if device:
+            hub_mac = hub_mac or device.get("hub_mac")
+        
+        pending = []
+        learned = 0
+        skipped = []
+        learned_on = hub_mac
+        previous_packet = None
+        stopped = False
+        
+        def commit():
+            """Write the buffered captures; returns an error message or None"""
+            nonlocal learned
+            if not pending:
+                return None
+            success, message = self.save_learned_signals(device_name, pending, device_description, learned_on)
+            if not success:
+                return message
+            learned += len(pending)
+            pending.clear()
+            return None
+        
+        try:
+            for index, (signal_name, signal_description) in enumerate(template):
+                if cancel_event is not None and cancel_event.is_set():
                     break
-        else:
-            # Add new device with UUID
-            devices_data.append({
-                "id": str(uuid.uuid4()),
-                "device_name": device_name,
-                "device_description": device_description,
-                "signals": [{
-                    "id": str(uuid.uuid4()),
-                    "signal_name": signal_name,
-                    "signal_description": signal_description,
-                    "signal_data": packet_base64
-                }]
-            })
-        
-        # Save updated data
-        self.save_devices(devices_data)
-        return True, f"Successfully saved '{device_name}.{signal_name}'"
-    
-    def send_signal(self, device_name, signal_name):
-        """Send an IR signal by device name and signal name"""
+                
+                on_poll = None
+                if progress:
+                    on_poll = lambda elapsed, limit, index=index, signal_name=signal_name: progress(index, signal_name, elapsed, limit)
+                for attempt in range(BULK_DUPLICATE_RETRIES + 1):
+                    packet, mac, error = self.capture_packet(hub_mac, timeout, on_poll, cancel_event)
+                    if packet is None or packet != previous_packet:
+                        break
+                    error = "Same code as the previous button (was it still held?)"
+                    if on_capture and attempt < BULK_DUPLICATE_RETRIES:
+                        on_capture(index, signal_name, False, f"{error}; press it again")
+                    packet = None
+                if packet is None:
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    skipped.append(signal_name)
+                    if on_capture:
+                        on_capture(index, signal_name, False, error)
+                    continue
+                
+                # Keep the first hub that heard the remote so a new device gets bound to it
+                learned_on = learned_on or mac
+                previous_packet = packet
+                pending.append((signal_name, packet, signal_description))
+                if on_capture:
+                    on_capture(index, signal_name, True, f"Captured '{device_name}.{signal_name}'")
+                if len(pending) >= checkpoint_every:
+                    error = commit()
+                    if error:
+                        return False, error
+        except KeyboardInterrupt:
+            stopped = True
+        finally:
+            # Ctrl+C, a cancel or an error still keeps what was captured so far
+            error = commit()
+        if error:
+            return False, error
+        
+        message = f"Learned {learned}/{len(template)} signals for '{device_name}'"
+        if skipped:
+            message += f" (skipped: {', '.join(skipped)})"
+        if stopped:
+            message += " (stopped early)"
+        return learned > 0, message
+    
+    def send_signal(self, device_name, signal_name, repeat=1, priority=PRIORITY_INTERACTIVE, coalesce=False):
+        """Send an IR signal by device name and signal name
+
+        repeat plays it that many times (e.g. volume up by 10); see _send_signal_data.
+        """
         # Get the signal
-        signal = self.get_signal(device_name, signal_name)
-        if not signal:
-            return False, f"Signal '{device_name}.{signal_name}' not found"
+        with self.catalog_lock:
+            signal = self.get_signal(device_name, signal_name)
+            if not signal:
+                return False, f"Signal '{device_name}.{signal_name}' not found"
+            device = self.registry.get_device(device_name)
         
-        return self._send_signal_data(signal, f"'{device_name}.{signal_name}'")
+        return self._send_signal_data(
+            signal, f"'{device_name}.{signal_name}'", device.get("hub_mac"), repeat, priority, coalesce
+        )
     
-    def send_signal_by_id(self, signal_id):
-        """Send an IR signal by its UUID"""
+    def send_signal_by_id(self, signal_id, repeat=1, priority=PRIORITY_INTERACTIVE, coalesce=False):
+        """Send an IR signal by its UUID, repeat times
+
+        coalesce merges this with an identical send that is queued or just went
+        out; only for callers known to duplicate requests, like the agent tools.
+        """
         # Get the signal and device by ID
         signal, device = self.get_signal_by_id(signal_id)
         if not signal:
             return False, f"Signal with ID '{signal_id}' not found"
         
+        return self._send_signal_data(
+            signal, self._identify(signal, device), device.get("hub_mac"), repeat, priority, coalesce
+        )
+    
+    def send_signals_by_id(self, signal_ids, delays=None, timed=False, priority=PRIORITY_INTERACTIVE):
+        """Send several signals, routing each to its device's hub
+
+        Hubs are driven concurrently; signals for the same hub go out in the given order.
+
+        Args:
+            delays: Optional seconds to wait before each signal, applied within its hub's sequence
+            timed: Also report when each send started (seconds into the batch) and how long it took
+            priority: Send queue priority
+
+        Returns:
+            list: A (success, message) tuple per signal ID, in input order, or
+                (success, message, started, duration) tuples when timed
+        """
+        results = [None] * len(signal_ids)
+        groups = {}
+        for index, signal_id in enumerate(signal_ids):
+            signal, device = self.get_signal_by_id(signal_id)
+            if not signal:
+                results[index] = (False, f"Signal with ID '{signal_id}' not found") + ((None, None) if timed else ())
+                continue
+            groups.setdefault(device.get("hub_mac"), []).append((index, signal, self._identify(signal, device)))
+        
+        batch_started = time.monotonic()
+        
+        def send_group(hub_mac, items):
+            for index, signal, identifier in items:
+                if delays and delays[index]:
+                    time.sleep(delays[index])
+                started = time.monotonic()
+                success, message = self._send_signal_data(signal, identifier, hub_mac, priority=priority)
+                if timed:
+                    results[index] = (success, message, started - batch_started, time.monotonic() - started)
+                else:
+                    results[index] = (success, message)
+        
+        if groups:
+            with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                for future in [executor.submit(send_group, hub_mac, items) for hub_mac, items in groups.items()]:
+                    future.result()
+        return results
+    
+    def send_macro(self, signal_ids, gap=MACRO_GAP):
+        """Send several signals of one hub as a single transmission; see MacroCompiler"""
+        return self.macros.send(signal_ids, gap)
+    
+    def _identify(self, signal, device):
         device_name = device.get("device_name", "Unknown")
         signal_name = signal.get("signal_name", "Unknown")
-        return self._send_signal_data(signal, f"'{device_name}.{signal_name}' (ID: {signal_id})")
+        return f"'{device_name}.{signal_name}' (ID: {signal.get('id')})"
     
-    def _send_signal_data(self, signal, identifier):
-        """Internal method to send signal data"""
-        # Decode the signal
+    def _send_signal_data(self, signal, identifier, hub_mac=None, repeat=1, priority=PRIORITY_INTERACTIVE, coalesce=False):
+        """Internal method to send signal data through hub_mac (or the default hub)
+
+        With repeat > 1 the packet's repeat byte is rewritten so the hub plays it
+        repeat times from a single send_data. Past what one byte holds, the
+        remainder goes out as further packets, paced by their play time.
+        With coalesce, an identical send still queued or just sent absorbs this one.
+        """
+        # Load the payload on first use
         try:
-            binary_signal = base64.b64decode(signal["signal_data"])
+            packets = repeat_chunks(self._load_packet(signal), max(int(repeat), 1))
         except Exception as e:
-            return False, f"Error decoding signal: {e}"
+            return False, f"Error loading signal: {e}"
         
-        # Send the signal
+        if repeat > 1:
+            identifier = f"{identifier} x{repeat}"
+        
+        key = (signal.get("id"), repeat) if coalesce else None
+        success, message = self.transmit(packets, identifier, hub_mac, priority, key)
+        if success:
+            self._record_send(signal)
+        return success, message
+    
+    def transmit(self, packets, identifier, hub_mac=None, priority=PRIORITY_INTERACTIVE, key=None):
+        """Send raw packets through hub_mac (or the default hub), reconnecting once on failure
+
+        key lets the hub's send queue merge this with an identical pending send; see SendQueue.
+        Once a hub's breaker is open, calls fail fast instead of reconnecting; see HubHealth.
+        """
+        mac = hub_mac or self.default_mac
+        health = self.hub_health(mac)
+        if not health.allow():
+            return False, f"Hub {mac or 'default'} is down, next reconnect attempt in {health.retry_in():.0f}s"
+        
+        # A trial through an open breaker starts from a fresh session and isn't retried
+        trial = health.state == DOWN
         try:
-            # Use the globally authenticated device if available
-            if self.device is None:
-                # If device is not available, try to discover and authenticate again
-                success, message = self.discover_and_auth()
-                if not success:
-                    return False, message
+            hub, error = self._reconnect_hub(hub_mac) if trial else self._get_hub(hub_mac)
+            if hub is None:
+                health.record_failure(error)
+                return False, error
             
-            self.device.send_data(binary_signal)
+            coalesced = self._send_packets(hub, packets, priority, key)
+            health.record_success()
+            if coalesced:
+                return True, f"Successfully sent {identifier} (merged with an identical send)"
             return True, f"Successfully sent {identifier}"
         except Exception as e:
-            # If sending fails, try to rediscover and authenticate once
+            if trial:
+                health.record_failure(e)
+                return False, f"Error sending signal: {e} (hub {mac or 'default'} is down)"
+            
+            # If sending fails, try to reconnect to that hub once; only the outcome counts
+            # toward the breaker, so one failed command is one failure
             try:
-                success, message = self.discover_and_auth()
-                if not success:
-                    return False, message
+                hub, error = self._reconnect_hub(hub_mac)
+                if hub is None:
+                    health.record_failure(error)
+                    return False, error
                 
-                self.device.send_data(binary_signal)
+                self._send_packets(hub, packets, priority)
+                health.record_success()
                 return True, f"Successfully sent {identifier}"
             except Exception as e2:
-                return False, f"Error sending signal: {e2}"
\ No newline at end of file
+                health.record_failure(e2)
+                return False, f"Error sending signal: {e2}"
+    
+    def _send_packets(self, hub, packets, priority=PRIORITY_INTERACTIVE, key=None):
+        """Queue packets on the hub's send queue and wait for them to go out
+
+        Returns:
+            bool: True if an identical send absorbed them
+        """
+        return self._send_queue(hub.mac.hex()).submit(packets, hub.send_data, priority, key)
+    
+    def _send_queue(self, mac):
+        with self.connect_lock:
+            queue = self.send_queues.get(mac)
+            if queue is None:
+                queue = SendQueue(
+                    mac, self.hub_locks.setdefault(mac, threading.Lock()), self.min_send_gap, self.coalesce_window
+                )
+                self.send_queues[mac] = queue
+            return queue
+    
+    def send_queue_stats(self):
+        """Depth, wait time and coalescing counters of each hub's send queue, keyed by MAC"""
+        return {mac: queue.stats() for mac, queue in list(self.send_queues.items())}
+    
+    def _record_send(self, signal):
+        """Count a successful send so the next startup can prefill the packet cache"""
+        if signal.get("id"):
+            self.send_counter.record(signal["id"])
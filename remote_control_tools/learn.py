@@ -1,19 +1,35 @@
-from ir_manager import IRManager
+from hub_daemon import daemon_request
 
-def learn_and_save(device_name: str, signal_name: str, signal_description: str = "", device_description: str = "", folder="signals"):
-    """Learn and save an IR signal using the IRManager class"""
-    # Create an instance of IRManager
-    ir_manager = IRManager(folder=folder)
-    
-    print(f"🕹️ Press the button for '{device_name}.{signal_name}'...")
+def learn_and_save(device_name: str, signal_name: str, signal_description: str = "", device_description: str = "", folder="signals",
+                   signal_type: str = "ir"):
+    """Learn and save an IR (or, with signal_type="rf", an RF) signal using the IRManager class"""
+    if signal_type == "rf":
+        print(f"🕹️ Hold the button for '{device_name}.{signal_name}' until the frequency is found, then press it once more...")
+    else:
+        print(f"🕹️ Press the button for '{device_name}.{signal_name}'...")
     
-    # Use the IRManager to learn the signal
-    success, message = ir_manager.learn_signal(
-        device_name, 
-        signal_name, 
-        signal_description, 
-        device_description
-    )
+    # Learn through the hub daemon when it is running, otherwise connect directly
+    response = daemon_request({
+        "cmd": "learn",
+        "device_name": device_name,
+        "signal_name": signal_name,
+        "signal_description": signal_description,
+        "device_description": device_description,
+        "signal_type": signal_type
+    })
+    if response is not None:
+        success, message = response["success"], response["message"]
+    else:
+        # Imported lazily so the daemon path never loads broadlink
+        from ir_manager import IRManager
+        ir_manager = IRManager(folder=folder)
+        learn = ir_manager.learn_rf_signal if signal_type == "rf" else ir_manager.learn_signal
+        success, message = learn(
+            device_name, 
+            signal_name, 
+            signal_description, 
+            device_description
+        )
     
     if success:
         print(f"✅ {message}")
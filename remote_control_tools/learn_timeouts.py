@@ -0,0 +1,6 @@
+# Learning defaults shared by IRManager and the hub daemon's clients; kept free of broadlink
+# so thin clients can size their socket timeouts without loading it
+
+# How long to wait for a button press, and how often to ask the hub for a packet
+LEARN_TIMEOUT = 20
+LEARN_POLL_INTERVAL = 0.2
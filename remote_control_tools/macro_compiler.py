@@ -0,0 +1,86 @@
+import hashlib
+from packet_cache import PacketCache
+from packet_format import concatenate, TICK
+
+# Silence between the commands of a macro; long enough for most devices to accept the next code
+MACRO_GAP = 0.3
+
+# Compiled macros kept in memory
+MACRO_CACHE_SIZE = 64
+
+class MacroCompiler:
+    """Compiles an ordered list of signals into one hub transmission
+
+    The stored packets are merged with packet_format.concatenate so the whole
+    sequence goes out in a single send_data. Compiled payloads are cached by the
+    content hash of their inputs (each signal's blob hash plus the gap), so
+    re-learning a signal naturally produces a new entry.
+
+    Signals that can't share a payload (different hubs, IR mixed with RF, too
+    long in total) are sent one by one instead, with the same gap between them.
+    """
+
+    def __init__(self, ir_manager, max_entries=MACRO_CACHE_SIZE):
+        self.ir_manager = ir_manager
+        self.cache = PacketCache(max_entries)
+
+    def compile(self, signal_ids, gap=MACRO_GAP):
+        """Build (or fetch) the combined payload
+
+        Returns:
+            tuple: (payload, hub_mac, None) or (None, None, error message)
+        """
+        entries = []
+        for signal_id in signal_ids:
+            signal, device = self.ir_manager.get_signal_by_id(signal_id)
+            if not signal:
+                return None, None, f"Signal with ID '{signal_id}' not found"
+            entries.append((signal, device))
+
+        hubs = {device.get("hub_mac") for _, device in entries}
+        if len(hubs) > 1:
+            return None, None, "Signals are on different hubs"
+
+        try:
+            packets = [self.ir_manager._load_packet(signal) for signal, _ in entries]
+        except Exception as e:
+            return None, None, f"Error loading signal: {e}"
+
+        key = self._content_hash(entries, packets, gap)
+        payload = self.cache.get(key)
+        if payload is None:
+            try:
+                payload = concatenate(packets, round(gap / TICK))
+            except ValueError as e:
+                return None, None, str(e)
+            self.cache.put(key, payload)
+        return payload, hubs.pop(), None
+
+    def send(self, signal_ids, gap=MACRO_GAP):
+        """Send the signals as one transmission when possible, else one by one
+
+        Returns:
+            tuple: (success, message)
+        """
+        payload, hub_mac, error = self.compile(signal_ids, gap)
+        if payload is None:
+            results = self.ir_manager.send_signals_by_id(signal_ids, delays=[0] + [gap] * (len(signal_ids) - 1))
+            sent = sum(success for success, _ in results)
+            failures = "; ".join(message for success, message in results if not success)
+            message = f"Sent {sent}/{len(signal_ids)} signals separately ({error})"
+            if failures:
+                message += f": {failures}"
+            return sent == len(signal_ids), message
+
+        success, message = self.ir_manager.transmit([payload], f"macro of {len(signal_ids)} signals", hub_mac)
+        if success:
+            for signal_id in signal_ids:
+                self.ir_manager.send_counter.record(signal_id)
+        return success, message
+
+    def _content_hash(self, entries, packets, gap):
+        digest = hashlib.sha256(repr(gap).encode("utf-8"))
+        for (signal, _), packet in zip(entries, packets):
+            # The blob hash already is the packet's content hash; legacy inline packets get hashed here
+            digest.update((signal.get("signal_hash") or hashlib.sha256(packet).hexdigest()).encode("utf-8"))
+        return digest.hexdigest()
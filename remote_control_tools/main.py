@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
-from ir_manager import IRManager
+from ir_manager import IRManager, BULK_LEARN_TIMEOUT
+from remote_templates import REMOTE_TEMPLATES, load_template
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
@@ -26,6 +27,7 @@ def display_main_menu():
     table.add_row("[2]", "Send IR Signals")
     table.add_row("[3]", "List All Devices and Signals")
     table.add_row("[4]", "Delete Device or Signal")
+    table.add_row("[5]", "Bulk Learn a Remote")
     table.add_row("[0]", "Exit")
     
     console.print(table)
@@ -198,6 +200,29 @@ def select_signal(device):
     console.print("[bold red]Invalid selection.[/bold red]")
     return None, ""
 
+def select_hub(ir_manager):
+    """Let user pick the hub a new device is in; returns None when there is only one"""
+    hubs = [hub for hub in ir_manager.list_hubs() if hub["connected"]]
+    if len(hubs) < 2:
+        return None
+    
+    table = Table(title="Available Hubs")
+    table.add_column("#", style="cyan", justify="right")
+    table.add_column("MAC", style="green")
+    table.add_column("Host", style="blue")
+    table.add_column("Name", style="magenta")
+    table.add_column("State", style="yellow")
+    
+    for i, hub in enumerate(hubs, 1):
+        table.add_row(f"[{i}]", hub["mac"], hub["host"] or "", hub["name"], hub["state"])
+    
+    console.print(table)
+    
+    choice = Prompt.ask("\nSelect the hub in the same room as this device", 
+                        choices=[str(i) for i in range(1, len(hubs) + 1)], 
+                        default="1")
+    return hubs[int(choice) - 1]["mac"]
+
 def learn_signals():
     """Learn IR signals"""
     ir_manager = IRManager()
@@ -258,8 +283,9 @@ def learn_signals():
         
         if is_new_device:
             console.print(f"[bold green]Creating new device: [/bold green][yellow]{device_name}[/yellow]")
-            # Create and save the device immediately
-            success, message = ir_manager.create_device(device_name, device_description)
+            # Create and save the device immediately, bound to a hub when there is more than one
+            hub_mac = select_hub(ir_manager)
+            success, message = ir_manager.create_device(device_name, device_description, hub_mac)
             if success:
                 console.print(f"[bold green]✅ {message}[/bold green]")
                 # Get the newly created device
@@ -322,9 +348,12 @@ def learn_signals():
                 console.print(f"\n[bold]Learning signal: [/bold][yellow]{device_name}.{signal_name}[/yellow]")
                 console.print("[bold cyan]🕹️ Press the button on your remote...[/bold cyan]")
                 
-                with console.status("[bold green]Waiting for signal...[/bold green]"):
+                with console.status("[bold green]Waiting for signal...[/bold green]") as status:
                     success, message = ir_manager.learn_signal(
-                        device_name, signal_name, signal_description, device_description
+                        device_name, signal_name, signal_description, device_description,
+                        progress=lambda elapsed, timeout: status.update(
+                            f"[bold green]Waiting for signal... {max(timeout - elapsed, 0):.0f}s left[/bold green]"
+                        )
                     )
                 
                 if success:
@@ -357,6 +386,70 @@ def learn_signals():
                 else:
                     break
 
+def bulk_learn_signals():
+    """Learn a whole remote from a template, one button after another"""
+    ir_manager = IRManager()
+    
+    console.clear()
+    console.print(Panel.fit("[bold blue]Bulk Remote Learning[/bold blue]", 
+                        subtitle="Press Ctrl+C to stop; captured buttons are kept"))
+    
+    with console.status("[bold green]Loading devices...[/bold green]"):
+        devices = ir_manager.get_devices()
+    
+    if devices:
+        device_name, device_description = select_device(devices)
+    else:
+        device_name = Prompt.ask("Enter new device name").strip().lower()
+        device_description = Prompt.ask("Enter device description (optional)", default="")
+    if not device_name:
+        input("\nPress Enter to return to main menu...")
+        return
+    
+    hub_mac = None
+    if ir_manager.get_device(device_name) is None:
+        hub_mac = select_hub(ir_manager)
+    
+    console.print(f"\n[bold cyan]Built-in templates:[/bold cyan] {', '.join(REMOTE_TEMPLATES)}")
+    console.print("[italic]Or enter the path of a file with one button name per line (name | description)[/italic]")
+    source = Prompt.ask("Template", default="tv").strip()
+    template, error = load_template(source)
+    if error:
+        console.print(f"[bold red]❌ {error}[/bold red]")
+        input("\nPress Enter to return to main menu...")
+        return
+    
+    console.print(f"\n[bold]Learning {len(template)} buttons for [/bold][yellow]{device_name}[/yellow]")
+    console.print("[bold cyan]🕹️ Press each button when it is named; skip one by waiting for the timeout.[/bold cyan]")
+    
+    def on_capture(index, signal_name, success, message):
+        if success:
+            console.print(f"[bold green]✅ [{index + 1}/{len(template)}] {signal_name}[/bold green]")
+        else:
+            console.print(f"[bold red]❌ [{index + 1}/{len(template)}] {signal_name}: {message}[/bold red]")
+    
+    try:
+        with console.status("[bold green]Waiting for signal...[/bold green]") as status:
+            success, message = ir_manager.bulk_learn(
+                device_name, template, device_description, hub_mac,
+                timeout=BULK_LEARN_TIMEOUT,
+                on_capture=on_capture,
+                progress=lambda index, signal_name, elapsed, timeout: status.update(
+                    f"[bold green][{index + 1}/{len(template)}] Press '{signal_name}'... "
+                    f"{max(timeout - elapsed, 0):.0f}s left[/bold green]"
+                )
+            )
+    except KeyboardInterrupt:
+        console.print("\n[bold yellow]Bulk learning interrupted.[/bold yellow]")
+        input("\nPress Enter to return to main menu...")
+        return
+    
+    if success:
+        console.print(f"[bold green]✅ {message}[/bold green]")
+    else:
+        console.print(f"[bold red]❌ {message}[/bold red]")
+    input("\nPress Enter to return to main menu...")
+
 def send_signals():
     """Send IR signals"""
     ir_manager = IRManager()
@@ -607,12 +700,12 @@ def delete_item():
         )
         
         if confirm == "y":
-            # Remove the device
-            devices.pop(device_index)
-            
-            # Save the updated devices
-            ir_manager.save_devices(devices)
-            console.print(f"[bold green]✅ Device '{device_name}' deleted successfully.[/bold green]")
+            # Remove the device and its signals from the store
+            success, message = ir_manager.delete_device(device_name)
+            if success:
+                console.print(f"[bold green]✅ {message}[/bold green]")
+            else:
+                console.print(f"[bold red]❌ {message}[/bold red]")
         elif confirm == "b":
             return  # Back to main menu
         else:
@@ -694,12 +787,12 @@ def delete_item():
         )
         
         if confirm == "y":
-            # Remove the signal
-            device["signals"].pop(signal_index)
-            
-            # Save the updated devices
-            ir_manager.save_devices(devices)
-            console.print(f"[bold green]✅ Signal '{device_name}.{signal_name}' deleted successfully.[/bold green]")
+            # Remove just this signal from the store
+            success, message = ir_manager.delete_signal(device_name, signal_name)
+            if success:
+                console.print(f"[bold green]✅ {message}[/bold green]")
+            else:
+                console.print(f"[bold red]❌ {message}[/bold red]")
         elif confirm == "b":
             return  # Back to main menu
         else:
@@ -732,7 +825,7 @@ def main():
             console.clear()
             display_main_menu()
             
-            choice = Prompt.ask("\nSelect an option", choices=["0", "1", "2", "3", "4"], default="1")
+            choice = Prompt.ask("\nSelect an option", choices=["0", "1", "2", "3", "4", "5"], default="1")
             
             if choice == "0":
                 console.print("[bold green]👋 Goodbye![/bold green]")
@@ -745,6 +838,8 @@ def main():
                 list_all()
             elif choice == "4":
                 delete_item()
+            elif choice == "5":
+                bulk_learn_signals()
             
         except KeyboardInterrupt:
             console.print("\n[bold yellow]Program interrupted by user.[/bold yellow]")
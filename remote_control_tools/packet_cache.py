@@ -0,0 +1,111 @@
+import os
+import json
+import atexit
+import threading
+from collections import OrderedDict
+
+# Decoded packets kept in memory; a packet is a few hundred bytes
+PACKET_CACHE_SIZE = 256
+
+# How many of the most-sent signals to load into the cache at startup
+PREFILL_COUNT = 32
+
+class PacketCache:
+    """Bounded LRU cache of decoded signal packets keyed by signal ID"""
+
+    def __init__(self, max_entries=PACKET_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, signal_id):
+        """Return the cached packet or None, counting the hit or miss"""
+        with self.lock:
+            packet = self.entries.get(signal_id)
+            if packet is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(signal_id)
+            self.hits += 1
+            return packet
+
+    def put(self, signal_id, packet):
+        with self.lock:
+            self.entries[signal_id] = packet
+            self.entries.move_to_end(signal_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, signal_id):
+        with self.lock:
+            self.entries.pop(signal_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Counters for sizing the cache"""
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "max_entries": self.max_entries
+            }
+
+class SendCounter:
+    """Per-signal send counts, persisted to signals/send_counts.json for cache prefill"""
+
+    def __init__(self, folder, flush_every=20):
+        self.path = os.path.join(folder, "send_counts.json")
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.counts = self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def record(self, signal_id):
+        with self.lock:
+            self.counts[signal_id] = self.counts.get(signal_id, 0) + 1
+            self.pending += 1
+            should_flush = self.pending >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def most_sent(self, limit):
+        with self.lock:
+            return sorted(self.counts, key=self.counts.get, reverse=True)[:limit]
+
+    def forget(self, signal_id):
+        with self.lock:
+            self.counts.pop(signal_id, None)
+
+    def flush(self):
+        """Write the counts if anything changed since the last flush"""
+        with self.lock:
+            if not self.pending:
+                return
+            counts = dict(self.counts)
+            self.pending = 0
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(counts, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving send counts: {e}")
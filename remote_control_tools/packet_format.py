@@ -0,0 +1,153 @@
+# Broadlink packet header: [type, repeat, length lo, length hi] followed by the pulse data.
+# The hub plays the packet (repeat + 1) times.
+IR_PACKET = 0x26
+RF_433_PACKET = 0xb2
+RF_315_PACKET = 0xd7
+PACKET_TYPES = (IR_PACKET, RF_433_PACKET, RF_315_PACKET)
+
+HEADER_SIZE = 4
+REPEAT_OFFSET = 1
+MAX_REPEAT = 255
+
+# One pulse-length unit in seconds (269 / 8.192 MHz, about 32.8 us)
+TICK = 269 / 8192000
+
+# Longest pulse a packet can encode (0x00 + 16-bit length)
+MAX_PULSE_TICKS = 0xffff
+
+# Largest payload we hand to send_data in one go; keeps the encrypted frame well inside one UDP datagram
+MAX_PACKET_SIZE = 1000
+
+def is_broadlink_packet(packet):
+    return len(packet) >= HEADER_SIZE and packet[0] in PACKET_TYPES
+
+def pulse_ticks(packet):
+    """Total length of one play of packet's pulses, in ticks
+
+    Each pulse is one byte, or 0x00 followed by a big-endian 16-bit length.
+    """
+    length = packet[2] | (packet[3] << 8)
+    data = memoryview(packet)[HEADER_SIZE:HEADER_SIZE + length]
+    ticks = 0
+    i = 0
+    while i < len(data):
+        if data[i] == 0 and i + 2 < len(data):
+            ticks += (data[i + 1] << 8) | data[i + 2]
+            i += 3
+        else:
+            ticks += data[i]
+            i += 1
+    return ticks
+
+def pulse_data(packet):
+    """Zero-copy view of packet's pulse bytes, without header or padding"""
+    length = packet[2] | (packet[3] << 8)
+    return memoryview(packet)[HEADER_SIZE:HEADER_SIZE + length]
+
+def last_pulse(data):
+    """Offset of the last pulse in data and the number of pulses (even means it ends on a space)"""
+    offset = 0
+    count = 0
+    i = 0
+    while i < len(data):
+        offset = i
+        i += 3 if data[i] == 0 and i + 2 < len(data) else 1
+        count += 1
+    return offset, count
+
+def concatenate(packets, gap_ticks):
+    """Merge packets into one payload that plays them back to back with gap_ticks of silence between
+
+    Pulses alternate mark/space starting with a mark, so the gap is added to a
+    packet's final space (or appended as a space when it ends on a mark).
+    Repeats are unrolled. The output is assembled by slice-assigning views of
+    the inputs into one preallocated bytearray.
+
+    Raises:
+        ValueError: When the packets can't share one payload (mixed IR/RF, too long, gap too long)
+    """
+    if not packets:
+        raise ValueError("Nothing to concatenate")
+    if not all(is_broadlink_packet(packet) for packet in packets):
+        raise ValueError("Not a Broadlink packet")
+    if len({packet[0] for packet in packets}) > 1:
+        raise ValueError("Can't mix IR and RF packets in one payload")
+    if gap_ticks > MAX_PULSE_TICKS:
+        raise ValueError(f"Gap longer than {MAX_PULSE_TICKS * TICK:.2f}s can't be encoded")
+
+    # Plan the layout first so the buffer is allocated once
+    plan = []  # (pulse view, plays, offset of the last pulse or None, pulse count)
+    total = 0
+    for index, packet in enumerate(packets):
+        data = pulse_data(packet)
+        plays = packet[REPEAT_OFFSET] + 1
+        total += len(data) * plays
+        if index == len(packets) - 1:
+            plan.append((data, plays, None, 0))
+            continue
+        offset, count = last_pulse(data)
+        if count % 2 == 0:
+            # Replace the final space with a 3-byte space that includes the gap
+            total += 3 - (len(data) - offset)
+        else:
+            total += 3
+        plan.append((data, plays, offset, count))
+
+    if HEADER_SIZE + total > MAX_PACKET_SIZE:
+        raise ValueError(f"Combined payload is {HEADER_SIZE + total} bytes, over the {MAX_PACKET_SIZE} byte limit")
+
+    out = bytearray(HEADER_SIZE + total)
+    out[0] = packets[0][0]
+    out[REPEAT_OFFSET] = 0
+    out[2] = total & 0xff
+    out[3] = total >> 8
+    position = HEADER_SIZE
+    for data, plays, offset, count in plan:
+        for play in range(plays):
+            if offset is None or play < plays - 1:
+                out[position:position + len(data)] = data
+                position += len(data)
+                continue
+
+            if count % 2 == 0:
+                last = data[offset:]
+                space = (last[1] << 8 | last[2]) if len(last) == 3 else last[0]
+                out[position:position + offset] = data[:offset]
+                position += offset
+            else:
+                space = 0
+                out[position:position + len(data)] = data
+                position += len(data)
+            space = min(space + gap_ticks, MAX_PULSE_TICKS)
+            out[position:position + 3] = bytes((0, space >> 8, space & 0xff))
+            position += 3
+    return bytes(out)
+
+def play_duration(packet):
+    """Seconds the hub spends playing packet, repeats included"""
+    if not is_broadlink_packet(packet):
+        return 0.0
+    return pulse_ticks(packet) * TICK * (packet[REPEAT_OFFSET] + 1)
+
+def repeat_chunks(packet, times):
+    """Split "play packet times times" into as few packets as the repeat byte allows
+
+    The packet's own repeat count is honoured, so a learned packet that already
+    plays twice is played 2 * times. Returns a list of packets to send in order;
+    it is a single packet unless the total exceeds what one repeat byte holds.
+    The input is never modified.
+    """
+    if times <= 1:
+        return [packet]
+    if not is_broadlink_packet(packet):
+        return [packet] * times
+
+    plays = (packet[REPEAT_OFFSET] + 1) * times
+    chunks = []
+    while plays > 0:
+        chunk_plays = min(plays, MAX_REPEAT + 1)
+        chunk = bytearray(packet)
+        chunk[REPEAT_OFFSET] = chunk_plays - 1
+        chunks.append(bytes(chunk))
+        plays -= chunk_plays
+    return chunks
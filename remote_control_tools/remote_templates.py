@@ -0,0 +1,98 @@
+import os
+
+# Button lists for common remotes, in the order they are usually laid out
+REMOTE_TEMPLATES = {
+    "tv": [
+        ("power", "Turn the TV on or off"),
+        ("input", "Cycle the input source"),
+        ("volume_up", "Raise the volume"),
+        ("volume_down", "Lower the volume"),
+        ("mute", "Mute or unmute"),
+        ("channel_up", "Next channel"),
+        ("channel_down", "Previous channel"),
+        ("up", "Navigate up"),
+        ("down", "Navigate down"),
+        ("left", "Navigate left"),
+        ("right", "Navigate right"),
+        ("ok", "Confirm the selection"),
+        ("back", "Go back"),
+        ("home", "Open the home screen"),
+        ("menu", "Open the menu"),
+        ("0", "Digit 0"),
+        ("1", "Digit 1"),
+        ("2", "Digit 2"),
+        ("3", "Digit 3"),
+        ("4", "Digit 4"),
+        ("5", "Digit 5"),
+        ("6", "Digit 6"),
+        ("7", "Digit 7"),
+        ("8", "Digit 8"),
+        ("9", "Digit 9"),
+    ],
+    "ac": [
+        ("power", "Turn the air conditioner on or off"),
+        ("mode", "Cycle cool, heat, dry and fan modes"),
+        ("temp_up", "Raise the target temperature"),
+        ("temp_down", "Lower the target temperature"),
+        ("fan_speed", "Cycle the fan speed"),
+        ("swing", "Toggle the louver swing"),
+        ("timer", "Set the timer"),
+        ("sleep", "Toggle sleep mode"),
+    ],
+    "soundbar": [
+        ("power", "Turn the soundbar on or off"),
+        ("input", "Cycle the input source"),
+        ("volume_up", "Raise the volume"),
+        ("volume_down", "Lower the volume"),
+        ("mute", "Mute or unmute"),
+        ("bass_up", "Raise the bass"),
+        ("bass_down", "Lower the bass"),
+        ("sound_mode", "Cycle the sound mode"),
+    ],
+    "projector": [
+        ("power", "Turn the projector on or off"),
+        ("input", "Cycle the input source"),
+        ("up", "Navigate up"),
+        ("down", "Navigate down"),
+        ("left", "Navigate left"),
+        ("right", "Navigate right"),
+        ("ok", "Confirm the selection"),
+        ("menu", "Open the menu"),
+        ("back", "Go back"),
+    ],
+}
+
+def load_template(source):
+    """Load a bulk-learn template by profile name or from a file
+
+    A template file has one button per line, optionally followed by "|" and a
+    description. Blank lines and lines starting with "#" are ignored.
+
+    Returns:
+        tuple: (list of (signal_name, signal_description) tuples, error message or None)
+    """
+    if source in REMOTE_TEMPLATES:
+        return list(REMOTE_TEMPLATES[source]), None
+
+    if not os.path.exists(source):
+        return [], f"Unknown template '{source}', expected a file or one of {', '.join(REMOTE_TEMPLATES)}"
+
+    template = []
+    seen = set()
+    try:
+        with open(source, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                signal_name, _, signal_description = line.partition("|")
+                signal_name = signal_name.strip().lower()
+                if signal_name and signal_name not in seen:
+                    seen.add(signal_name)
+                    template.append((signal_name, signal_description.strip()))
+    except Exception as e:
+        return [], f"Error reading template '{source}': {e}"
+
+    if not template:
+        return [], f"Template '{source}' has no buttons"
+    return template, None
@@ -0,0 +1,209 @@
+import os
+import json
+import uuid
+import time
+import asyncio
+import threading
+from send_queue import PRIORITY_BACKGROUND
+
+# Finished runs remembered for status queries
+KEEP_FINISHED_RUNS = 20
+
+class SceneStore:
+    """Named step lists in signals/scenes.json, next to devices.json
+
+    Format: {"movie_mode": {"description": "...", "steps": [{"signal_id": "...", "delay": 8}, ...]}}
+    where delay is the seconds to wait before that step.
+    """
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, "scenes.json")
+        self.lock = threading.Lock()
+        self.stat = None
+        self.scenes = {}
+
+    def load(self):
+        """Return all scenes, re-reading the file only when it changed"""
+        with self.lock:
+            try:
+                st = os.stat(self.path)
+                stat = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                self.stat, self.scenes = None, {}
+                return {}
+            if stat != self.stat:
+                try:
+                    with open(self.path, "r") as f:
+                        self.scenes = json.load(f)
+                except Exception as e:
+                    print(f"Error loading scenes: {e}")
+                    self.scenes = {}
+                self.stat = stat
+            return self.scenes
+
+    def get(self, name):
+        return self.load().get(name)
+
+    def save_scene(self, name, steps, description=""):
+        """Create or replace a scene
+
+        Args:
+            steps: List of (signal_id, delay) tuples or {"signal_id", "delay"} dicts
+        """
+        normalized = []
+        for step in steps:
+            if isinstance(step, dict):
+                signal_id, delay = step["signal_id"], step.get("delay", 0)
+            else:
+                signal_id, delay = step
+            normalized.append({"signal_id": signal_id, "delay": max(float(delay or 0), 0)})
+
+        scenes = dict(self.load())
+        scenes[name] = {"description": description, "steps": normalized}
+        return self._write(scenes)
+
+    def delete_scene(self, name):
+        scenes = dict(self.load())
+        if name not in scenes:
+            return False, f"Scene '{name}' not found"
+        del scenes[name]
+        return self._write(scenes)
+
+    def _write(self, scenes):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(scenes, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            return False, f"Error saving scenes: {e}"
+        return True, "Scenes saved"
+
+class SceneRun:
+    """Cancellable handle for one run of a scene"""
+
+    def __init__(self, scene_name, steps):
+        self.id = uuid.uuid4().hex[:8]
+        self.scene_name = scene_name
+        self.steps = steps
+        self.results = [None] * len(steps)  # (success, message) per step once it ran
+        self.started = time.time()
+        self.task = None
+
+    def cancel(self):
+        """Stop the run; steps already sent stay sent"""
+        if self.task and not self.task.done():
+            self.task.cancel()
+            return True
+        return False
+
+    def done(self):
+        return self.task is not None and self.task.done()
+
+    def status(self):
+        if self.task is None or not self.task.done():
+            state = "running"
+        elif self.task.cancelled():
+            state = "cancelled"
+        elif self.task.exception() is not None:
+            state = "failed"
+        else:
+            state = "finished"
+        return {
+            "run_id": self.id,
+            "scene": self.scene_name,
+            "state": state,
+            "sent": sum(1 for result in self.results if result and result[0]),
+            "failed": sum(1 for result in self.results if result and not result[0]),
+            "steps": len(self.steps)
+        }
+
+    async def wait(self):
+        """Wait for the run to end
+
+        Returns:
+            tuple: (success, message)
+        """
+        # asyncio.wait doesn't re-raise the run's own cancellation, only the caller's
+        await asyncio.wait([self.task])
+        status = self.status()
+        if status["state"] == "cancelled":
+            return False, f"Scene '{self.scene_name}' cancelled after {status['sent']}/{status['steps']} steps"
+        if status["state"] == "failed":
+            return False, f"Scene '{self.scene_name}' failed: {self.task.exception()}"
+        failures = "; ".join(result[1] for result in self.results if result and not result[0])
+        message = f"Scene '{self.scene_name}': sent {status['sent']}/{status['steps']} steps"
+        if failures:
+            message += f" ({failures})"
+        return status["failed"] == 0, message
+
+class SceneEngine:
+    """Runs scenes on the asyncio loop through an AsyncIRManager
+
+    Steps are split into one branch per hub. Each branch runs its steps in
+    order, sleeping each step's delay first, and the branches run concurrently,
+    so a slow warm-up on one hub never holds back another. Steps go out at
+    background priority, behind interactive commands for the same hub.
+    """
+
+    def __init__(self, async_ir_manager, store):
+        self.ir = async_ir_manager
+        self.store = store
+        self.runs = {}
+
+    async def start(self, name):
+        """Start a scene in the background
+
+        Returns:
+            tuple: (SceneRun, None) or (None, error message)
+        """
+        scene = self.store.get(name)
+        if scene is None:
+            available = ", ".join(self.store.load()) or "none"
+            return None, f"Scene '{name}' not found (available: {available})"
+
+        steps = scene.get("steps", [])
+        branches = {}
+        for index, step in enumerate(steps):
+            signal, device = await self.ir.get_signal_by_id(step["signal_id"])
+            if not signal:
+                return None, f"Scene '{name}' step {index + 1}: signal with ID '{step['signal_id']}' not found"
+            branches.setdefault(device.get("hub_mac"), []).append((index, step))
+
+        run = SceneRun(name, steps)
+        run.task = asyncio.create_task(self._run(run, branches))
+        self.runs[run.id] = run
+        # Keep the most recent finished runs around for status queries
+        finished = [run_id for run_id, other in self.runs.items() if other.done()]
+        for run_id in finished[:-KEEP_FINISHED_RUNS]:
+            del self.runs[run_id]
+        return run, None
+
+    async def run(self, name):
+        """Run a scene to completion
+
+        Returns:
+            tuple: (success, message)
+        """
+        run, error = await self.start(name)
+        if run is None:
+            return False, error
+        return await run.wait()
+
+    def cancel(self, run_id):
+        run = self.runs.get(run_id)
+        if run is None:
+            return False, f"No scene run with ID '{run_id}'"
+        if not run.cancel():
+            return False, f"Scene run '{run_id}' already ended"
+        return True, f"Cancelling scene '{run.scene_name}' (run {run_id})"
+
+    async def _run(self, run, branches):
+        await asyncio.gather(*(self._run_branch(run, steps) for steps in branches.values()))
+
+    async def _run_branch(self, run, steps):
+        for index, step in steps:
+            if step.get("delay"):
+                await asyncio.sleep(step["delay"])
+            run.results[index] = await self.ir.send_signal_by_id(step["signal_id"], priority=PRIORITY_BACKGROUND)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import sys
+import os
+import asyncio
+
+# Add the project root to the path so we can import ir_manager
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+from scene_engine import SceneStore, SceneEngine
+from rich.console import Console
+from rich.panel import Panel
+
+console = Console()
+
+SIGNALS_FOLDER = "signals"
+
+def display_scenes(store):
+    """Display all scenes with their steps"""
+    from rich.table import Table
+
+    scenes = store.load()
+    if not scenes:
+        console.print("[bold yellow]No scenes found.[/bold yellow]")
+        return
+
+    table = Table(title="Scenes")
+    table.add_column("Scene", style="green")
+    table.add_column("Description", style="blue")
+    table.add_column("Steps", style="cyan", justify="right")
+    table.add_column("Total Delay", style="magenta", justify="right")
+
+    for name, scene in scenes.items():
+        steps = scene.get("steps", [])
+        table.add_row(name, scene.get("description", ""), str(len(steps)),
+                      f"{sum(step.get('delay', 0) for step in steps):g}s")
+
+    console.print(table)
+
+def show_scene(store, name):
+    """Display the steps of one scene"""
+    from rich.table import Table
+
+    scene = store.get(name)
+    if scene is None:
+        console.print(f"[bold red]❌ Scene '{name}' not found[/bold red]")
+        return
+
+    table = Table(title=f"Scene: {name}")
+    table.add_column("#", style="cyan", justify="right")
+    table.add_column("Delay", style="magenta", justify="right")
+    table.add_column("Signal ID", style="yellow")
+
+    for i, step in enumerate(scene.get("steps", []), 1):
+        table.add_row(f"[{i}]", f"{step.get('delay', 0):g}s", step["signal_id"])
+
+    console.print(table)
+
+def parse_steps(args):
+    """Parse "<signal_id>[@delay]" arguments into (signal_id, delay) tuples"""
+    steps = []
+    for arg in args:
+        signal_id, _, delay = arg.partition("@")
+        steps.append((signal_id, float(delay) if delay else 0))
+    return steps
+
+async def run_scene(store, name):
+    """Run a scene, cancelling it on Ctrl+C"""
+    from async_ir_manager import AsyncIRManager
+
+    with console.status("[bold blue]Connecting to Broadlink hub...[/bold blue]"):
+        ir_manager = await AsyncIRManager.create(folder=SIGNALS_FOLDER, use_daemon=True)
+    engine = SceneEngine(ir_manager, store)
+
+    run, error = await engine.start(name)
+    if run is None:
+        console.print(f"[bold red]❌ {error}[/bold red]")
+        return False
+
+    try:
+        with console.status(f"[bold blue]Running scene '{name}' (Ctrl+C to cancel)...[/bold blue]"):
+            success, message = await run.wait()
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        run.cancel()
+        success, message = await run.wait()
+
+    if success:
+        console.print(f"[bold green]✅ {message}[/bold green]")
+    else:
+        console.print(f"[bold red]❌ {message}[/bold red]")
+    return success
+
+def main():
+    """Main function for command-line usage"""
+    if len(sys.argv) == 1:
+        # No arguments, display help
+        console.print(Panel("""
+[bold]Usage:[/bold]
+  [green]python scenes.py list[/green]                               # List all scenes
+  [green]python scenes.py show <scene>[/green]                       # Show a scene's steps
+  [green]python scenes.py add <scene> <id>[@delay] ...[/green]       # Create or replace a scene
+  [green]python scenes.py delete <scene>[/green]                     # Delete a scene
+  [green]python scenes.py run <scene>[/green]                        # Run a scene
+
+A step's delay is the seconds to wait before sending it. Steps on the same
+hub run in order; steps on different hubs run in parallel.
+        """, title="Scenes"))
+        return
+
+    store = SceneStore(SIGNALS_FOLDER)
+    command = sys.argv[1].lower()
+
+    if command == "list":
+        display_scenes(store)
+    elif command == "show" and len(sys.argv) > 2:
+        show_scene(store, sys.argv[2])
+    elif command == "add" and len(sys.argv) > 3:
+        success, message = store.save_scene(sys.argv[2], parse_steps(sys.argv[3:]))
+        if success:
+            console.print(f"[bold green]✅ Scene '{sys.argv[2]}' saved[/bold green]")
+        else:
+            console.print(f"[bold red]❌ {message}[/bold red]")
+    elif command == "delete" and len(sys.argv) > 2:
+        success, message = store.delete_scene(sys.argv[2])
+        if success:
+            console.print(f"[bold green]✅ Scene '{sys.argv[2]}' deleted[/bold green]")
+        else:
+            console.print(f"[bold red]❌ {message}[/bold red]")
+    elif command == "run" and len(sys.argv) > 2:
+        asyncio.run(run_scene(store, sys.argv[2]))
+    else:
+        console.print(f"[bold red]Unknown command: {' '.join(sys.argv[1:])}[/bold red]")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        console.print("\n[bold yellow]Program terminated by user.[/bold yellow]")
+    except Exception as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
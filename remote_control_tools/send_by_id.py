@@ -4,8 +4,9 @@ import os
 
 # Add the project root to the path so we can import ir_manager
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
-from ir_manager import IRManager
+from hub_daemon import daemon_request
 from rich.console import Console
+from rich.panel import Panel
 import sys
 import json
 import os
@@ -22,13 +23,11 @@ def send_signal_by_id(signal_id, silent=False):
     Returns:
         bool: True if successful, False otherwise
     """
-    ir_manager = IRManager()
-    
     if not silent:
         with console.status(f"[bold blue]Sending signal with ID: {signal_id}...[/bold blue]"):
-            success, message = ir_manager.send_signal_by_id(signal_id)
+            success, message = _send_by_id(signal_id)
     else:
-        success, message = ir_manager.send_signal_by_id(signal_id)
+        success, message = _send_by_id(signal_id)
     
     if success:
         if not silent:
@@ -39,10 +38,47 @@ def send_signal_by_id(signal_id, silent=False):
             console.print(f"[bold red]❌ {message}[/bold red]")
         return False
 
+def _send_by_id(signal_id):
+    """Send through the hub daemon when it is running, otherwise connect directly"""
+    response = daemon_request({"cmd": "send", "signal_id": signal_id})
+    if response is not None:
+        return response["success"], response["message"]
+    
+    # Imported lazily so the daemon path never loads broadlink
+    from ir_manager import IRManager
+    return IRManager().send_signal_by_id(signal_id)
+
+def send_signals_by_id(signal_ids):
+    """Send several signals at once; signals on different hubs go out concurrently
+    
+    Returns:
+        bool: True if every signal was sent
+    """
+    with console.status(f"[bold blue]Sending {len(signal_ids)} signals...[/bold blue]"):
+        response = daemon_request({"cmd": "send_many", "signal_ids": signal_ids})
+        if response is not None and "results" in response:
+            results = [(result["success"], result["message"]) for result in response["results"]]
+        elif response is not None:
+            results = [(False, response["message"])] * len(signal_ids)
+        else:
+            from ir_manager import IRManager
+            results = IRManager().send_signals_by_id(signal_ids)
+    
+    for success, message in results:
+        if success:
+            console.print(f"[bold green]✅ {message}[/bold green]")
+        else:
+            console.print(f"[bold red]❌ {message}[/bold red]")
+    return all(success for success, _ in results)
+
 def list_all_signals():
     """List all available signals with their IDs"""
-    ir_manager = IRManager()
-    devices = ir_manager.get_devices()
+    response = daemon_request({"cmd": "list"})
+    if response is not None and response["success"]:
+        devices = response["devices"]
+    else:
+        from ir_manager import IRManager
+        devices = IRManager().get_devices()
     
     if not devices:
         console.print("[bold yellow]No devices found.[/bold yellow]")
@@ -123,6 +159,7 @@ def main():
   [green]python send_by_id.py list[/green]                # List all signals with their IDs
   [green]python send_by_id.py export [filename][/green]   # Export signals to JSON file
   [green]python send_by_id.py <signal_id>[/green]         # Send signal by ID
+  [green]python send_by_id.py <id> <id> ...[/green]       # Send several signals, hubs in parallel
         """, title="Send Signal by ID"))
         return
     
@@ -133,6 +170,9 @@ def main():
     elif command == "export":
         filename = sys.argv[2] if len(sys.argv) > 2 else "signals_export.json"
         export_signals_to_json(filename)
+    elif len(sys.argv) > 2:
+        # Several signal IDs
+        send_signals_by_id(sys.argv[1:])
     else:
         # Assume the argument is a signal ID
         signal_id = command
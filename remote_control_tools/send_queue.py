@@ -0,0 +1,139 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from packet_format import play_duration
+
+# Lower goes first: someone is waiting on interactive sends, scene steps can wait a moment
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Silence the hub gets after a packet finishes playing before the next send_data
+MIN_SEND_GAP = 0.05
+
+# A coalescing send arriving this soon after an identical one is merged into it
+COALESCE_WINDOW = 1.0
+
+class SendQueue:
+    """Priority queue in front of one hub
+
+    A worker thread takes jobs lowest priority value first (FIFO within a
+    priority) and calls send(packet) for each of a job's packets, never sooner
+    than the previous packet's play time plus min_gap after the last
+    send_data. Callers block on their job's result.
+
+    Jobs submitted with a coalesce key are merged with a job of the same key
+    that is still pending or finished successfully less than coalesce_window
+    ago, so a command issued twice in a row is only played once. Callers opt in
+    per send; without a key every submit is played, so deliberate repeat
+    presses go out.
+
+    Ordering, pacing and coalescing only cover sends made through this
+    process. The CLI tools, the agent and scenes therefore send through the
+    hub daemon whenever it is running; see hub_daemon.
+    """
+
+    def __init__(self, name, lock=None, min_gap=MIN_SEND_GAP, coalesce_window=COALESCE_WINDOW):
+        self.name = name
+        self.lock = lock or threading.Lock()  # Held around send_data, shared with anything else that drives the hub
+        self.min_gap = min_gap
+        self.coalesce_window = coalesce_window
+        self.condition = threading.Condition()
+        self.heap = []
+        self.sequence = itertools.count()
+        self.recent = {}  # coalesce key -> (future, finished at, or None while pending)
+        self.ready_at = 0.0
+        self.worker = None
+        self.started = 0
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def submit(self, packets, send, priority=PRIORITY_INTERACTIVE, key=None):
+        """Queue packets and wait until they were sent
+
+        Returns:
+            bool: True if the job was merged into an identical one instead of sent again
+
+        Raises:
+            Whatever send raised for this job (or the job it was merged into)
+        """
+        future, coalesced = self._enqueue(packets, send, priority, key)
+        future.result()
+        return coalesced
+
+    def _enqueue(self, packets, send, priority, key):
+        with self.condition:
+            now = time.monotonic()
+            if key is not None:
+                previous = self.recent.get(key)
+                if previous is not None:
+                    future, finished = previous
+                    if finished is None or now - finished < self.coalesce_window:
+                        self.coalesced += 1
+                        return future, True
+
+            future = Future()
+            heapq.heappush(self.heap, (priority, next(self.sequence), now, packets, send, future, key))
+            if key is not None:
+                self.recent = {k: v for k, v in self.recent.items()
+                               if v[1] is None or now - v[1] < self.coalesce_window}
+                self.recent[key] = (future, None)
+            self.max_depth = max(self.max_depth, len(self.heap))
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._work, name=f"send-queue-{self.name}", daemon=True)
+                self.worker.start()
+            self.condition.notify()
+            return future, False
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while not self.heap:
+                    self.condition.wait()
+                _, _, enqueued, packets, send, future, key = heapq.heappop(self.heap)
+                wait = time.monotonic() - enqueued
+                self.started += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+            try:
+                with self.lock:
+                    for packet in packets:
+                        delay = self.ready_at - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                        send(packet)
+                        self.ready_at = time.monotonic() + play_duration(packet) + self.min_gap
+            except Exception as e:
+                with self.condition:
+                    self.failed += 1
+                    # A failed send is never merged into; the next identical one goes out
+                    if key is not None and self.recent.get(key, (None,))[0] is future:
+                        del self.recent[key]
+                future.set_exception(e)
+                continue
+
+            with self.condition:
+                self.sent += 1
+                # The window starts once the packets went out, however long they waited or played
+                if key is not None and self.recent.get(key, (None,))[0] is future:
+                    self.recent[key] = (future, time.monotonic())
+            future.set_result(None)
+
+    def stats(self):
+        """Queue depth and wait-time counters"""
+        with self.condition:
+            return {
+                "depth": len(self.heap),
+                "max_depth": self.max_depth,
+                "sent": self.sent,
+                "failed": self.failed,
+                "coalesced": self.coalesced,
+                "avg_wait_ms": round(self.total_wait / self.started * 1000, 1) if self.started else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 1)
+            }
@@ -1,4 +1,4 @@
-from ir_manager import IRManager
+from hub_daemon import daemon_request
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -8,6 +8,31 @@ import sys
 
 console = Console()
 
+_ir_manager = None
+
+def _get_ir_manager():
+    """Connect to the hub directly, once; only used when no hub daemon is running"""
+    global _ir_manager
+    if _ir_manager is None:
+        # Imported lazily so the daemon path never loads broadlink
+        from ir_manager import IRManager
+        _ir_manager = IRManager()
+    return _ir_manager
+
+def _get_devices():
+    """List devices through the hub daemon when it is running, otherwise connect directly"""
+    response = daemon_request({"cmd": "list"})
+    if response is not None and response["success"]:
+        return response["devices"]
+    return _get_ir_manager().get_devices()
+
+def _send_signal(device_name, signal_name):
+    """Send through the hub daemon's warm connection when it is running, otherwise connect directly"""
+    response = daemon_request({"cmd": "send_by_name", "device_name": device_name, "signal_name": signal_name})
+    if response is not None:
+        return response["success"], response["message"]
+    return _get_ir_manager().send_signal(device_name, signal_name)
+
 def display_devices_and_signals(devices):
     """Display all devices and their signals in a rich table"""
     if not devices:
@@ -57,12 +82,10 @@ def display_devices_and_signals(devices):
 
 def interactive_mode():
     """Interactive mode for sending signals"""
-    ir_manager = IRManager()
-    
     while True:
         console.clear()
         with console.status("[bold green]Loading devices...[/bold green]"):
-            devices = ir_manager.get_devices()
+            devices = _get_devices()
         
         if not devices:
             console.print("[bold red]No devices found. Please run start_learning.py first.[/bold red]")
@@ -133,7 +156,7 @@ def interactive_mode():
             
             # Send the signal
             with console.status("[bold green]Sending signal...[/bold green]"):
-                success, message = ir_manager.send_signal(device["device_name"], signal["signal_name"])
+                success, message = _send_signal(device["device_name"], signal["signal_name"])
             
             if success:
                 console.print(f"[bold green]✅ {message}[/bold green]")
@@ -145,16 +168,13 @@ def interactive_mode():
 
 def list_devices():
     """Just list devices and signals"""
-    ir_manager = IRManager()
-    devices = ir_manager.get_devices()
+    devices = _get_devices()
     display_devices_and_signals(devices)
 
 def send_specific_signal(device_name, signal_name):
     """Send a specific signal by name"""
-    ir_manager = IRManager()
-    
     with console.status("[bold green]Sending signal...[/bold green]"):
-        success, message = ir_manager.send_signal(device_name, signal_name)
+        success, message = _send_signal(device_name, signal_name)
     
     if success:
         console.print(f"[bold green]✅ {message}[/bold green]")
@@ -0,0 +1,61 @@
+class SignalRegistry:
+    """Hash indexes over the devices catalog so lookups don't scan the nested lists"""
+
+    def __init__(self, devices=None):
+        self.devices_by_name = {}
+        self.devices_by_id = {}
+        self.signals_by_pair = {}
+        self.signals_by_id = {}
+        self.rebuild(devices or [])
+
+    def rebuild(self, devices):
+        """Drop every index and rebuild them from the devices list"""
+        self.devices_by_name.clear()
+        self.devices_by_id.clear()
+        self.signals_by_pair.clear()
+        self.signals_by_id.clear()
+
+        for device in devices:
+            self.add_device(device)
+
+    def add_device(self, device):
+        """Index a device and all of its signals"""
+        self.devices_by_name[device["device_name"]] = device
+        if device.get("id"):
+            self.devices_by_id[device["id"]] = device
+
+        for signal in device.get("signals", []):
+            self.add_signal(device, signal)
+
+    def add_signal(self, device, signal):
+        """Index a single signal that belongs to device"""
+        self.signals_by_pair[(device["device_name"], signal["signal_name"])] = signal
+        if signal.get("id"):
+            self.signals_by_id[signal["id"]] = (signal, device)
+
+    def remove_device(self, device):
+        """Remove a device and all of its signals from the indexes"""
+        for signal in device.get("signals", []):
+            self.remove_signal(device, signal)
+
+        self.devices_by_name.pop(device["device_name"], None)
+        if device.get("id"):
+            self.devices_by_id.pop(device["id"], None)
+
+    def remove_signal(self, device, signal):
+        """Remove a single signal from the indexes"""
+        self.signals_by_pair.pop((device["device_name"], signal["signal_name"]), None)
+        if signal.get("id"):
+            self.signals_by_id.pop(signal["id"], None)
+
+    def get_device(self, device_name):
+        return self.devices_by_name.get(device_name)
+
+    def get_device_by_id(self, device_id):
+        return self.devices_by_id.get(device_id)
+
+    def get_signal(self, device_name, signal_name):
+        return self.signals_by_pair.get((device_name, signal_name))
+
+    def get_signal_by_id(self, signal_id):
+        return self.signals_by_id.get(signal_id, (None, None))
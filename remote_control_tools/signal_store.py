@@ -0,0 +1,304 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process locks only
+    fcntl = None
+
+STORAGE_BACKENDS = ("json", "sqlite")
+
+# Fold the journal back into devices.json once it holds this many records
+COMPACT_THRESHOLD = 500
+
+class JsonSignalStore:
+    """Stores the devices catalog as a devices.json snapshot plus an append-only journal
+
+    Each mutation appends one JSON line to devices.journal; loading replays the
+    journal over the snapshot. Once the journal grows past compact_threshold it
+    is renamed to devices.journal.compacting and folded into a fresh snapshot on
+    a background thread, while new records go to a new journal.
+
+    poll() lets long-running processes pick up changes made by other processes:
+    it stats the three files and either replays just the new journal bytes or
+    reloads everything when the snapshot was rewritten.
+
+    Appends, compaction and save_all also hold an flock on devices.lock, so two
+    processes never rewrite the snapshot from different views of the journal.
+    Lock order: compaction_lock, then the file lock, then lock.
+    """
+
+    def __init__(self, folder, compact_threshold=COMPACT_THRESHOLD):
+        self.folder = folder
+        self.json_path = os.path.join(folder, "devices.json")
+        self.journal_path = os.path.join(folder, "devices.journal")
+        self.compacting_path = self.journal_path + ".compacting"
+        self.lock_path = os.path.join(folder, "devices.lock")
+        self.compact_threshold = compact_threshold
+        self.journal_records = 0
+        self.journal_offset = 0  # Journal bytes already applied to the loaded devices
+        self.journal_stat = None
+        self.snapshot_stat = None
+        self.compacting_stat = None
+        self.lock = threading.Lock()  # Guards journal appends and renames
+        self.compaction_lock = threading.Lock()  # Guards snapshot rewrites
+
+    def load(self):
+        """Load the snapshot and replay any journaled mutations over it"""
+        with self.lock:
+            # Stat before reading so a concurrent writer shows up on the next poll
+            self.snapshot_stat = self._stat(self.json_path)
+            self.compacting_stat = self._stat(self.compacting_path)
+            self.journal_stat = self._stat(self.journal_path)
+            devices = self._read_snapshot()
+            self._replay(devices, self.compacting_path)
+            self.journal_records, self.journal_offset = self._replay(devices, self.journal_path)
+        return devices
+
+    def poll(self, devices):
+        """Bring devices up to date with the files on disk
+
+        Returns None when nothing changed, otherwise the refreshed devices list
+        (the same list updated in place when only the journal grew).
+        """
+        with self.lock:
+            snapshot_changed = (self._stat(self.json_path) != self.snapshot_stat
+                                or self._stat(self.compacting_path) != self.compacting_stat)
+            journal_stat = self._stat(self.journal_path)
+            if not snapshot_changed:
+                journal_size = journal_stat[1] if journal_stat else 0
+                known_inode = self.journal_stat[2] if self.journal_stat else None
+                if journal_stat is None or known_inode is None or journal_stat[2] == known_inode:
+                    if journal_size == self.journal_offset:
+                        return None
+                    if journal_size > self.journal_offset:
+                        count, self.journal_offset = self._replay(devices, self.journal_path, self.journal_offset)
+                        self.journal_records += count
+                        self.journal_stat = journal_stat
+                        return devices
+        return self.load()
+
+    def generation(self):
+        """Fingerprint of the files on disk; it changes whenever any process writes the catalog"""
+        return (self._stat(self.json_path), self._stat(self.compacting_path), self._stat(self.journal_path))
+
+    def save_all(self, devices):
+        """Replace the stored catalog with devices and drop the journal"""
+        with self.compaction_lock, self._file_lock(), self.lock:
+            self._write_snapshot(devices)
+            for path in (self.journal_path, self.compacting_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.journal_records = 0
+            self._mark_snapshot_current()
+
+    def save_device(self, devices, device):
+        self._append({"op": "put_device", "device": self._device_meta(device)})
+
+    def save_signal(self, devices, device, signal):
+        self._append({"op": "put_signal", "device": self._device_meta(device), "signal": signal})
+
+    def save_signals(self, devices, device, signals):
+        """Journal several signals of one device in a single write"""
+        meta = self._device_meta(device)
+        self._append(*({"op": "put_signal", "device": meta, "signal": signal} for signal in signals))
+
+    def delete_device(self, devices, device):
+        self._append({"op": "delete_device", "device_id": device["id"]})
+
+    def delete_signal(self, devices, device, signal):
+        self._append({"op": "delete_signal", "device_id": device["id"], "signal_id": signal["id"]})
+
+    def compact(self):
+        """Fold the journal into a new devices.json snapshot"""
+        with self.compaction_lock, self._file_lock():
+            with self.lock:
+                # A leftover .compacting file means an earlier compaction died; finish that one first
+                if not os.path.exists(self.compacting_path):
+                    if not os.path.exists(self.journal_path):
+                        return
+                    os.replace(self.journal_path, self.compacting_path)
+                    self.journal_records = 0
+
+            devices = self._read_snapshot()
+            self._replay(devices, self.compacting_path)
+            self._write_snapshot(devices)
+            with self.lock:
+                os.remove(self.compacting_path)
+                # The new snapshot holds exactly what we had already applied
+                self.snapshot_stat = self._stat(self.json_path)
+                self.compacting_stat = None
+
+    def _append(self, *records):
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        with self._file_lock(), self.lock:
+            with open(self.journal_path, "ab") as f:
+                start = f.tell()
+                f.write(data.encode("utf-8"))
+                end = f.tell()
+            if start == self.journal_offset:
+                # Nobody else appended since we last looked, so our view already includes this record
+                self.journal_offset = end
+                self.journal_stat = self._stat(self.journal_path)
+            self.journal_records += len(records)
+            should_compact = self.journal_records >= self.compact_threshold
+
+        if should_compact and not self.compaction_lock.locked():
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Error compacting devices journal: {e}")
+
+    def check(self):
+        """Check that the snapshot and journal can be read
+
+        Returns:
+            tuple: (success, message)
+        """
+        if not os.path.exists(self.json_path) and not os.path.exists(self.journal_path):
+            return False, f"Neither '{self.json_path}' nor '{self.journal_path}' exists"
+
+        if os.path.exists(self.json_path):
+            try:
+                with open(self.json_path, "r") as f:
+                    json.load(f)
+            except Exception as e:
+                return False, f"JSON file '{self.json_path}' is not valid: {e}"
+
+        bad_lines = 0
+        records = 0
+        for path in (self.compacting_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        json.loads(line)
+                        records += 1
+                    except json.JSONDecodeError:
+                        bad_lines += 1
+        if bad_lines:
+            return False, f"Journal has {bad_lines} unreadable records (and {records} valid ones)"
+        devices = self.load()
+        return True, f"Catalog is valid: {len(devices)} devices ({records} journaled changes not yet compacted)"
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive flock on devices.lock, shared by every process using this folder"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _mark_snapshot_current(self):
+        self.snapshot_stat = self._stat(self.json_path)
+        self.compacting_stat = None
+        self.journal_stat = None
+        self.journal_offset = 0
+
+    def _stat(self, path):
+        """Cheap change fingerprint for path, or None if it does not exist"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.json_path):
+            return []
+
+        try:
+            with open(self.json_path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return []
+
+    def _write_snapshot(self, devices):
+        """Write devices.json atomically so a crash never leaves a truncated file"""
+        tmp_path = f"{self.json_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(devices, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.json_path)
+
+    def _replay(self, devices, path, offset=0):
+        """Apply the records in path after offset to devices in place
+
+        Returns (record count, offset just past the last complete line).
+        """
+        if not os.path.exists(path):
+            return 0, 0
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+
+        devices_by_id = {device.get("id"): device for device in devices}
+        count = 0
+        # Only complete lines are applied; a trailing partial line is either
+        # still being written by another process or torn by a crash
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._apply(devices, devices_by_id, record)
+            count += 1
+        return count, offset + len(complete)
+
+    def _apply(self, devices, devices_by_id, record):
+        op = record.get("op")
+        if op in ("put_device", "put_signal"):
+            meta = record["device"]
+            device = devices_by_id.get(meta["id"])
+            if device is None:
+                device = dict(meta, signals=[])
+                devices.append(device)
+                devices_by_id[meta["id"]] = device
+            else:
+                # Replace the metadata wholesale so removed keys (e.g. hub_mac) stay removed
+                signals = device["signals"]
+                device.clear()
+                device.update(meta, signals=signals)
+
+            if op == "put_signal":
+                signal = record["signal"]
+                for i, existing in enumerate(device["signals"]):
+                    if existing.get("id") == signal["id"]:
+                        device["signals"][i] = signal
+                        break
+                else:
+                    device["signals"].append(signal)
+        elif op == "delete_device":
+            device = devices_by_id.pop(record["device_id"], None)
+            if device is not None:
+                devices.remove(device)
+        elif op == "delete_signal":
+            device = devices_by_id.get(record["device_id"])
+            if device is not None:
+                device["signals"] = [s for s in device["signals"] if s.get("id") != record["signal_id"]]
+
+    def _device_meta(self, device):
+        return {key: value for key, value in device.items() if key != "signals"}
+
+def create_signal_store(storage, folder):
+    """Build the store backend named by storage"""
+    if storage == "json":
+        return JsonSignalStore(folder)
+    if storage == "sqlite":
+        from sqlite_store import SqliteSignalStore
+        return SqliteSignalStore(folder)
+    raise ValueError(f"Unknown storage backend '{storage}', expected one of {STORAGE_BACKENDS}")
@@ -0,0 +1,213 @@
+import os
+import sqlite3
+import threading
+from signal_store import JsonSignalStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS devices (
+    id TEXT PRIMARY KEY,
+    device_name TEXT NOT NULL UNIQUE,
+    device_description TEXT NOT NULL DEFAULT '',
+    hub_mac TEXT
+);
+CREATE TABLE IF NOT EXISTS signals (
+    id TEXT PRIMARY KEY,
+    device_id TEXT NOT NULL REFERENCES devices(id) ON DELETE CASCADE,
+    signal_name TEXT NOT NULL,
+    signal_description TEXT NOT NULL DEFAULT '',
+    signal_data TEXT,
+    signal_hash TEXT,
+    signal_type TEXT NOT NULL DEFAULT 'ir',
+    frequency REAL,
+    UNIQUE (device_id, signal_name)
+);
+CREATE INDEX IF NOT EXISTS idx_signals_device ON signals(device_id);
+"""
+
+class SqliteSignalStore:
+    """Stores devices and signals as rows in signals/devices.db (WAL mode)"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.db_path = os.path.join(folder, "devices.db")
+        self.lock = threading.Lock()
+        self.data_version = None
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._add_missing_columns()
+        self._migrate_from_json()
+
+    def _add_missing_columns(self):
+        """Bring databases created by older versions up to the current schema"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(signals)")}
+        if "signal_hash" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE signals ADD COLUMN signal_hash TEXT")
+        if "signal_type" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE signals ADD COLUMN signal_type TEXT NOT NULL DEFAULT 'ir'")
+                self.conn.execute("ALTER TABLE signals ADD COLUMN frequency REAL")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(devices)")}
+        if "hub_mac" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE devices ADD COLUMN hub_mac TEXT")
+
+    def _migrate_from_json(self):
+        """Import signals/devices.json once, the first time the database is opened"""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_from_json'").fetchone()
+        if row:
+            return
+
+        devices = JsonSignalStore(self.folder).load()
+        with self.lock, self.conn:
+            for device in devices:
+                self._upsert_device(device)
+                for signal in device.get("signals", []):
+                    self._upsert_signal(device, signal)
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)", (str(len(devices)),))
+
+    def load(self):
+        """Load the devices list in insertion order"""
+        with self.lock:
+            # data_version only moves when another connection commits
+            self.data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            device_rows = self.conn.execute(
+                "SELECT id, device_name, device_description, hub_mac FROM devices ORDER BY rowid"
+            ).fetchall()
+            signal_rows = self.conn.execute(
+                "SELECT device_id, id, signal_name, signal_description, signal_data, signal_hash, signal_type, frequency "
+                "FROM signals ORDER BY rowid"
+            ).fetchall()
+
+        devices = []
+        devices_by_id = {}
+        for device_id, device_name, device_description, hub_mac in device_rows:
+            device = {
+                "id": device_id,
+                "device_name": device_name,
+                "device_description": device_description,
+                "signals": []
+            }
+            if hub_mac:
+                device["hub_mac"] = hub_mac
+            devices.append(device)
+            devices_by_id[device_id] = device
+
+        for device_id, signal_id, signal_name, signal_description, signal_data, signal_hash, signal_type, frequency in signal_rows:
+            device = devices_by_id.get(device_id)
+            if device is None:
+                continue
+            signal = {
+                "id": signal_id,
+                "signal_name": signal_name,
+                "signal_description": signal_description,
+                "signal_type": signal_type
+            }
+            if frequency is not None:
+                signal["frequency"] = frequency
+            if signal_hash:
+                signal["signal_hash"] = signal_hash
+            if signal_data:
+                signal["signal_data"] = signal_data
+            device["signals"].append(signal)
+
+        return devices
+
+    def poll(self, devices):
+        """Return a freshly loaded devices list if another process wrote, else None"""
+        with self.lock:
+            data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self.data_version:
+            return None
+        return self.load()
+
+    def generation(self):
+        """Changes whenever the database does; data_version only covers other connections, so add our own writes"""
+        with self.lock:
+            return (self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes)
+
+    def check(self):
+        """Run SQLite's integrity check
+
+        Returns:
+            tuple: (success, message)
+        """
+        try:
+            with self.lock:
+                result = self.conn.execute("PRAGMA quick_check").fetchone()[0]
+                count = self.conn.execute("SELECT COUNT(*) FROM devices").fetchone()[0]
+        except sqlite3.Error as e:
+            return False, f"Database '{self.db_path}' can't be read: {e}"
+        if result != "ok":
+            return False, f"Database '{self.db_path}' failed its integrity check: {result}"
+        return True, f"Database '{self.db_path}' is valid: {count} devices"
+
+    def save_all(self, devices):
+        """Replace every row with the contents of devices"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM signals")
+            self.conn.execute("DELETE FROM devices")
+            for device in devices:
+                self._upsert_device(device)
+                for signal in device.get("signals", []):
+                    self._upsert_signal(device, signal)
+
+    def save_device(self, devices, device):
+        with self.lock, self.conn:
+            self._upsert_device(device)
+
+    def save_signal(self, devices, device, signal):
+        with self.lock, self.conn:
+            self._upsert_device(device)
+            self._upsert_signal(device, signal)
+
+    def save_signals(self, devices, device, signals):
+        with self.lock, self.conn:
+            self._upsert_device(device)
+            for signal in signals:
+                self._upsert_signal(device, signal)
+
+    def delete_device(self, devices, device):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM signals WHERE device_id = ?", (device["id"],))
+            self.conn.execute("DELETE FROM devices WHERE id = ?", (device["id"],))
+
+    def delete_signal(self, devices, device, signal):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM signals WHERE id = ?", (signal["id"],))
+
+    def _upsert_device(self, device):
+        self.conn.execute(
+            """INSERT INTO devices (id, device_name, device_description, hub_mac) VALUES (?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   device_name = excluded.device_name,
+                   device_description = excluded.device_description,
+                   hub_mac = excluded.hub_mac""",
+            (device["id"], device["device_name"], device.get("device_description", ""), device.get("hub_mac"))
+        )
+
+    def _upsert_signal(self, device, signal):
+        self.conn.execute(
+            """INSERT INTO signals (id, device_id, signal_name, signal_description, signal_data, signal_hash,
+                                   signal_type, frequency)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   device_id = excluded.device_id,
+                   signal_name = excluded.signal_name,
+                   signal_description = excluded.signal_description,
+                   signal_data = excluded.signal_data,
+                   signal_hash = excluded.signal_hash,
+                   signal_type = excluded.signal_type,
+                   frequency = excluded.frequency""",
+            (signal["id"], device["id"], signal["signal_name"],
+             signal.get("signal_description", ""), signal.get("signal_data"), signal.get("signal_hash"),
+             signal.get("signal_type", "ir"), signal.get("frequency"))
+        )
@@ -147,9 +147,12 @@ def main():
             console.print(f"\n[bold]Learning signal: [/bold][yellow]{device_name}.{signal_name}[/yellow]")
             console.print("[bold cyan]🕹️ Press the button on your remote...[/bold cyan]")
             
-            with console.status("[bold green]Waiting for signal...[/bold green]"):
+            with console.status("[bold green]Waiting for signal...[/bold green]") as status:
                 success, message = ir_manager.learn_signal(
-                    device_name, signal_name, signal_description, device_description
+                    device_name, signal_name, signal_description, device_description,
+                    progress=lambda elapsed, timeout: status.update(
+                        f"[bold green]Waiting for signal... {max(timeout - elapsed, 0):.0f}s left[/bold green]"
+                    )
                 )
             
             if success: